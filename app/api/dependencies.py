@@ -3,14 +3,19 @@ API依赖注入模块
 定义FastAPI的依赖项
 """
 
-from fastapi import Depends, HTTPException
-from sqlalchemy.orm import Session
+from typing import Tuple
 
+import msgspec
+from fastapi import Depends, FastAPI, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import get_settings
 from ..models.database import get_db
+from ..models.structs import AIConfigResponse
 from ..services.query_service import QueryService
 
 
-def get_query_service(db: Session = Depends(get_db)) -> QueryService:
+def get_query_service(db: AsyncSession = Depends(get_db)) -> QueryService:
     """
     获取查询服务实例
 
@@ -20,4 +25,60 @@ def get_query_service(db: Session = Depends(get_db)) -> QueryService:
     Returns:
         QueryService: 查询服务实例
     """
-    return QueryService(db)
\ No newline at end of file
+    return QueryService.for_session(db)
+
+
+def init_ai_state(app: FastAPI):
+    """
+    初始化应用级AI提供商状态（启动时调用）
+
+    Args:
+        app: FastAPI应用实例
+    """
+    app.state.ai_factory = QueryService.ai_factory
+    app.state.ai_factory.warm()
+    refresh_provider_info(app)
+
+
+def refresh_provider_info(app: FastAPI):
+    """
+    重新计算并缓存AI提供商信息，同时预先序列化 /api/ai-providers 的响应体
+
+    Args:
+        app: FastAPI应用实例
+    """
+    factory = app.state.ai_factory
+    provider_list = list(factory.get_provider_info().values())
+
+    app.state.available_provider_names = factory.get_available_names()
+    app.state.ai_providers_payload = msgspec.json.encode(AIConfigResponse(
+        default_provider=get_settings().ai_fast.default_provider,
+        available_providers=provider_list,
+        total_providers=len(provider_list)
+    ))
+
+
+def get_available_provider_names(request: Request) -> Tuple[str, ...]:
+    """
+    获取缓存的可用AI提供商名称
+
+    Args:
+        request: 请求对象
+
+    Returns:
+        Tuple[str, ...]: 可用提供商名称
+    """
+    return request.app.state.available_provider_names
+
+
+def get_ai_providers_payload(request: Request) -> bytes:
+    """
+    获取预先序列化的AI提供商配置响应体
+
+    Args:
+        request: 请求对象
+
+    Returns:
+        bytes: AIConfigResponse格式的JSON字节串
+    """
+    return request.app.state.ai_providers_payload
@@ -0,0 +1,34 @@
+"""
+API响应类模块
+定义基于orjson / msgspec的高性能JSON响应
+"""
+
+from typing import Any
+
+import msgspec
+import orjson
+from fastapi.responses import JSONResponse
+
+
+class ORJSONResponse(JSONResponse):
+    """使用orjson序列化的JSON响应"""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        """将内容序列化为JSON字节串"""
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+# msgspec编码器（线程安全，可在所有响应间复用）
+_MSGSPEC_ENCODER = msgspec.json.Encoder()
+
+
+class MsgspecJSONResponse(JSONResponse):
+    """使用msgspec序列化的JSON响应（内容可直接包含msgspec.Struct）"""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        """将内容序列化为JSON字节串"""
+        return _MSGSPEC_ENCODER.encode(content)
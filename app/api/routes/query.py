@@ -3,19 +3,28 @@
 处理问题查询的主要业务接口
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from typing import Dict, Any
+import logging
+from datetime import datetime
+from typing import Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from ...models.schemas import (
-    QueryRequest, QueryResponse, QueryData,
-    SystemInfo, HealthCheckResponse, AIConfigResponse, ErrorResponse
+    QueryRequest, QueryResponse, parse_query_request,
+    SystemInfo, HealthCheckResponse, AIConfigResponse
 )
+from ...models import structs
 from ...models.database import get_db, QuestionAnswerRepository
+from ..dependencies import (
+    get_query_service, get_available_provider_names, get_ai_providers_payload, refresh_provider_info
+)
+from ..responses import MsgspecJSONResponse
 from ...services.query_service import QueryService
-from ...utils.ai_providers.factory import AIProviderFactory
 from ...config import get_settings
 
+logger = logging.getLogger(__name__)
+
 # 创建路由器
 router = APIRouter(prefix="/api", tags=["查询"])
 
@@ -28,7 +37,7 @@ async def query_answer(
     title: str = Query(..., description="问题标题"),
     options: str = Query("", description="选项内容"),
     type: str = Query("", description="问题类型"),
-    db: Session = Depends(get_db)
+    query_service: QueryService = Depends(get_query_service)
 ):
     """
     查询问题答案接口
@@ -39,10 +48,10 @@ async def query_answer(
         title: 问题标题
         options: 选项内容
         type: 问题类型
-        db: 数据库会话
+        query_service: 查询服务
 
     Returns:
-        QueryResponse: 查询响应结果
+        MsgspecJSONResponse: 查询响应结果（QueryResponse格式）
     """
     try:
         # 验证输入参数
@@ -57,28 +66,22 @@ async def query_answer(
             )
 
         # 创建查询请求
-        request = QueryRequest(
-            title=title.strip(),
-            options=options,
-            type=type
-        )
-
-        # 创建查询服务
-        query_service = QueryService(db)
+        request = parse_query_request({
+            "title": title,
+            "options": options,
+            "type": type
+        })
 
         # 执行查询
-        result = query_service.query_answer(request)
+        result = await query_service.query_answer(request)
 
         # 返回响应
-        return QueryResponse(
-            success=True,
-            data=result
-        )
+        return MsgspecJSONResponse(content=structs.QueryResponse(success=True, data=result))
 
     except HTTPException:
         raise
     except Exception as e:
-        print(f"[API] 查询接口异常: {str(e)}")
+        logger.exception("查询接口异常: %s", e)
         raise HTTPException(
             status_code=500,
             detail={
@@ -92,7 +95,7 @@ async def query_answer(
 @router.post("/query", response_model=QueryResponse)
 async def query_answer_post(
     request: QueryRequest,
-    db: Session = Depends(get_db)
+    query_service: QueryService = Depends(get_query_service)
 ):
     """
     查询问题答案接口 (POST版本)
@@ -101,28 +104,22 @@ async def query_answer_post(
 
     Args:
         request: 查询请求对象
-        db: 数据库会话
+        query_service: 查询服务
 
     Returns:
-        QueryResponse: 查询响应结果
+        MsgspecJSONResponse: 查询响应结果（QueryResponse格式）
     """
     try:
-        # 创建查询服务
-        query_service = QueryService(db)
-
         # 执行查询
-        result = query_service.query_answer(request)
+        result = await query_service.query_answer(request)
 
         # 返回响应
-        return QueryResponse(
-            success=True,
-            data=result
-        )
+        return MsgspecJSONResponse(content=structs.QueryResponse(success=True, data=result))
 
     except HTTPException:
         raise
     except Exception as e:
-        print(f"[API] POST查询接口异常: {str(e)}")
+        logger.exception("POST查询接口异常: %s", e)
         raise HTTPException(
             status_code=500,
             detail={
@@ -133,22 +130,21 @@ async def query_answer_post(
         )
 
 
-@router.get("/stats", response_model=Dict[str, Any])
-async def get_statistics(db: Session = Depends(get_db)):
+@router.get("/stats")
+async def get_statistics(query_service: QueryService = Depends(get_query_service)):
     """
     获取系统统计信息
 
     Args:
-        db: 数据库会话
+        query_service: 查询服务
 
     Returns:
-        Dict: 统计信息
+        MsgspecJSONResponse: 统计信息
     """
     try:
-        query_service = QueryService(db)
-        return query_service.get_statistics()
+        return MsgspecJSONResponse(content=await query_service.get_statistics())
     except Exception as e:
-        print(f"[API] 获取统计信息失败: {str(e)}")
+        logger.exception("获取统计信息失败: %s", e)
         raise HTTPException(
             status_code=500,
             detail={
@@ -160,79 +156,52 @@ async def get_statistics(db: Session = Depends(get_db)):
 
 
 @router.get("/ai-providers", response_model=AIConfigResponse)
-async def get_ai_providers():
+async def get_ai_providers(payload: bytes = Depends(get_ai_providers_payload)):
     """
     获取AI提供商配置信息
 
+    Args:
+        payload: 启动时（及切换提供商后）预先序列化的响应体
+
     Returns:
-        AIConfigResponse: AI配置响应
+        Response: AIConfigResponse格式的JSON响应
     """
-    try:
-        factory = AIProviderFactory()
-        providers_info = factory.get_provider_info()
-
-        # 转换为响应格式
-        provider_list = []
-        for name, info in providers_info.items():
-            provider_list.append({
-                "name": info["name"],
-                "enabled": info["enabled"],
-                "has_api_key": info["has_api_key"],
-                "model": info["model"],
-                "is_available": info["is_available"]
-            })
-
-        return AIConfigResponse(
-            default_provider=settings.ai.default_provider,
-            available_providers=provider_list,
-            total_providers=len(provider_list)
-        )
-
-    except Exception as e:
-        print(f"[API] 获取AI提供商信息失败: {str(e)}")
-        raise HTTPException(
-            status_code=500,
-            detail={
-                "success": False,
-                "error": f"获取AI配置失败: {str(e)}",
-                "error_code": "AI_CONFIG_ERROR"
-            }
-        )
+    return Response(content=payload, media_type="application/json")
 
 
 @router.get("/system/info", response_model=SystemInfo)
-async def get_system_info(db: Session = Depends(get_db)):
+async def get_system_info(
+    db: AsyncSession = Depends(get_db),
+    available_providers: Tuple[str, ...] = Depends(get_available_provider_names)
+):
     """
     获取系统信息
 
     Args:
         db: 数据库会话
+        available_providers: 启动时缓存的可用提供商名称
 
     Returns:
-        SystemInfo: 系统信息
+        MsgspecJSONResponse: 系统信息（SystemInfo格式）
     """
     try:
         # 获取数据库状态
         repository = QuestionAnswerRepository(db)
-        total_questions = repository.count_all()
+        total_questions = await repository.count_all()
 
-        # 获取AI提供商数量
-        factory = AIProviderFactory()
-        available_providers = factory.get_available_providers()
-
-        return SystemInfo(
-            app_name=settings.app.name,
-            version=settings.app.version,
-            description=settings.app.description,
-            homepage=settings.app.homepage,
+        return MsgspecJSONResponse(content=structs.SystemInfo(
+            app_name=settings.app_fast.name,
+            version=settings.app_fast.version,
+            description=settings.app_fast.description,
+            homepage=settings.app_fast.homepage,
             author="Toni Wang",
             email="shell7@petalmail.com",
             ai_providers_count=len(available_providers),
             database_status="connected" if total_questions >= 0 else "disconnected"
-        )
+        ))
 
     except Exception as e:
-        print(f"[API] 获取系统信息失败: {str(e)}")
+        logger.exception("获取系统信息失败: %s", e)
         raise HTTPException(
             status_code=500,
             detail={
@@ -244,66 +213,70 @@ async def get_system_info(db: Session = Depends(get_db)):
 
 
 @router.get("/health", response_model=HealthCheckResponse)
-async def health_check(db: Session = Depends(get_db)):
+async def health_check(
+    db: AsyncSession = Depends(get_db),
+    available_providers: Tuple[str, ...] = Depends(get_available_provider_names)
+):
     """
     健康检查接口
 
     Args:
         db: 数据库会话
+        available_providers: 启动时缓存的可用提供商名称
 
     Returns:
-        HealthCheckResponse: 健康检查结果
+        MsgspecJSONResponse: 健康检查结果（HealthCheckResponse格式）
     """
-    from datetime import datetime
+    # 时间戳只生成一次，直接以ISO字符串写入响应
+    timestamp = datetime.now().isoformat()
 
     try:
         # 检查数据库连接
         repository = QuestionAnswerRepository(db)
-        db_status = "connected" if repository.count_all() >= 0 else "disconnected"
-
-        # 检查AI提供商
-        factory = AIProviderFactory()
-        available_providers = factory.get_available_providers()
+        db_status = "connected" if await repository.count_all() >= 0 else "disconnected"
 
-        return HealthCheckResponse(
+        return MsgspecJSONResponse(content=structs.HealthCheckResponse(
             status="healthy",
-            timestamp=datetime.now(),
-            version=settings.app.version,
+            timestamp=timestamp,
+            version=settings.app_fast.version,
             database=db_status,
             ai_providers=len(available_providers)
-        )
+        ))
 
     except Exception as e:
-        print(f"[API] 健康检查失败: {str(e)}")
-        return HealthCheckResponse(
+        logger.exception("健康检查失败: %s", e)
+        return MsgspecJSONResponse(content=structs.HealthCheckResponse(
             status="unhealthy",
-            timestamp=datetime.now(),
-            version=settings.app.version,
+            timestamp=timestamp,
+            version=settings.app_fast.version,
             database="disconnected",
             ai_providers=0
-        )
+        ))
 
 
 @router.post("/ai/switch/{provider_name}")
 async def switch_ai_provider(
     provider_name: str,
-    db: Session = Depends(get_db)
+    request: Request,
+    query_service: QueryService = Depends(get_query_service)
 ):
     """
     切换AI提供商
 
     Args:
         provider_name: 提供商名称
-        db: 数据库会话
+        request: 请求对象
+        query_service: 查询服务
 
     Returns:
         Dict: 切换结果
     """
     try:
-        query_service = QueryService(db)
         success = query_service.switch_ai_provider(provider_name)
 
         if success:
+            # 提供商状态可能变化，重新计算缓存信息
+            refresh_provider_info(request.app)
             return {
                 "success": True,
                 "message": f"已切换到AI提供商: {provider_name}"
@@ -321,7 +294,7 @@ async def switch_ai_provider(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"[API] 切换AI提供商异常: {str(e)}")
+        logger.exception("切换AI提供商异常: %s", e)
         raise HTTPException(
             status_code=500,
             detail={
@@ -5,20 +5,25 @@
 
 import os
 import yaml
-from typing import List, Optional, Dict, Any
-from pydantic import Field, validator
-try:
-    from pydantic_settings import BaseSettings
-except ImportError:
-    from pydantic import BaseSettings
+from dataclasses import dataclass
+from functools import cached_property, lru_cache
+from typing import List, Optional, Dict
+from pydantic import Field, TypeAdapter
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+# 优先使用libyaml的C实现加载器
+YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
 
 class DatabaseConfig(BaseSettings):
     """数据库配置"""
     url: str = Field(default="sqlite:///./question_bank.db", description="数据库连接URL")
     echo: bool = Field(default=False, description="是否打印SQL语句")
-    pool_size: int = Field(default=5, description="连接池大小")
-    max_overflow: int = Field(default=10, description="最大溢出连接数")
+    pool_size: int = Field(default=20, description="连接池大小")
+    max_overflow: int = Field(default=40, description="最大溢出连接数")
+    write_queue_size: int = Field(default=10000, description="后台写入队列容量")
+    write_batch_size: int = Field(default=128, description="后台单次批量写入的最大记录数")
+    write_flush_interval: float = Field(default=0.2, description="后台批量写入的最长等待时间（秒）")
 
 
 class ServerConfig(BaseSettings):
@@ -26,6 +31,10 @@ class ServerConfig(BaseSettings):
     host: str = Field(default="0.0.0.0", description="服务器主机")
     port: int = Field(default=8000, description="服务器端口")
     reload: bool = Field(default=False, description="是否开启热重载")
+    workers: int = Field(default=1, ge=0, description="工作进程数（0表示CPU核心数，热重载时固定为1）")
+    thread_pool_size: int = Field(default=100, description="工作线程池大小")
+    gzip_min_size: int = Field(default=512, description="启用Gzip压缩的最小响应字节数")
+    gzip_level: int = Field(default=4, ge=1, le=9, description="Gzip压缩级别")
 
 
 class ProviderConfig(BaseSettings):
@@ -38,6 +47,8 @@ class ProviderConfig(BaseSettings):
     max_tokens: int = Field(default=512, description="最大令牌数")
     temperature: float = Field(default=0.1, description="温度参数")
     top_p: float = Field(default=0.9, description="Top-p参数")
+    stream: bool = Field(default=False, description="是否使用流式响应（收到完整答案后提前结束）")
+    ca_bundle: str = Field(default="", description="自定义CA证书文件路径（自签名证书时使用）")
 
 
 class AIConfig(BaseSettings):
@@ -46,6 +57,11 @@ class AIConfig(BaseSettings):
     timeout: int = Field(default=30, description="请求超时时间（秒）")
     max_retries: int = Field(default=3, description="最大重试次数")
     retry_delay: int = Field(default=2, description="重试延迟（秒）")
+    speculative: bool = Field(default=False, description="查询本地题库的同时提前发起AI请求")
+    enable_batching: bool = Field(default=False, description="把同时到达的多道题目合并为一次AI请求")
+    batch_size: int = Field(default=8, ge=1, description="单次合并请求的最大题目数")
+    batch_window: float = Field(default=0.02, ge=0, description="等待凑批的最长时间（秒）")
+    parallel_fallback: bool = Field(default=False, description="同时向所有可用提供商提问，采用最先返回的有效答案")
 
 
 class LoggingConfig(BaseSettings):
@@ -64,6 +80,17 @@ class CacheConfig(BaseSettings):
     """缓存配置"""
     enabled: bool = Field(default=True, description="是否启用缓存")
     ttl: int = Field(default=3600, description="缓存时间（秒）")
+    max_size: int = Field(default=10000, description="最大缓存条目数")
+
+
+class SemanticCacheConfig(BaseSettings):
+    """语义缓存配置（相似问题复用AI答案，需要安装 sentence-transformers 和 hnswlib）"""
+    enabled: bool = Field(default=False, description="是否启用语义缓存")
+    model: str = Field(default="sentence-transformers/all-MiniLM-L6-v2", description="句向量模型")
+    threshold: float = Field(default=0.95, description="命中所需的最低余弦相似度")
+    max_elements: int = Field(default=100000, description="最多缓存的答案数")
+    ef: int = Field(default=32, description="HNSW查询参数ef")
+    index_path: str = Field(default="data/semantic_cache", description="索引持久化目录（为空则不持久化）")
 
 
 class SecurityConfig(BaseSettings):
@@ -88,6 +115,32 @@ class AppConfig(BaseSettings):
     debug: bool = Field(default=True, description="调试模式")
 
 
+@dataclass(frozen=True, slots=True)
+class AppSnapshot:
+    """应用配置只读快照（热路径上的普通属性访问）"""
+    name: str
+    version: str
+    description: str
+    homepage: str
+    debug: bool
+
+
+@dataclass(frozen=True, slots=True)
+class AISnapshot:
+    """AI服务配置只读快照"""
+    default_provider: str
+    timeout: int
+    max_retries: int
+    retry_delay: int
+    speculative: bool
+    enable_batching: bool
+    parallel_fallback: bool
+
+
+# 提供商配置字典校验器
+_PROVIDERS_ADAPTER = TypeAdapter(Dict[str, ProviderConfig])
+
+
 class Settings(BaseSettings):
     """全局配置"""
     app: AppConfig = Field(default_factory=AppConfig)
@@ -97,30 +150,35 @@ class Settings(BaseSettings):
     providers: Dict[str, ProviderConfig] = Field(default_factory=dict)
     logging: LoggingConfig = Field(default_factory=LoggingConfig)
     cache: CacheConfig = Field(default_factory=CacheConfig)
+    semantic_cache: SemanticCacheConfig = Field(default_factory=SemanticCacheConfig)
     security: SecurityConfig = Field(default_factory=SecurityConfig)
 
-    class Config:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
-        case_sensitive = False
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        case_sensitive=False
+    )
 
     @classmethod
     def load_from_yaml(cls, file_path: str = "config.yaml") -> "Settings":
-        """从YAML文件加载配置"""
+        """从YAML文件加载配置（文件未修改时复用上次解析结果）"""
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"配置文件不存在: {file_path}")
 
+        return cls._load_from_yaml_cached(file_path, os.path.getmtime(file_path))
+
+    @classmethod
+    @lru_cache(maxsize=4)
+    def _load_from_yaml_cached(cls, file_path: str, mtime: float) -> "Settings":
+        """按(文件路径, 修改时间)缓存的YAML配置解析"""
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
-                config_data = yaml.safe_load(f)
-
-            # 处理providers配置
-            providers = {}
-            if 'providers' in config_data:
-                for provider_name, provider_data in config_data['providers'].items():
-                    providers[provider_name] = ProviderConfig(**provider_data)
+                config_data = yaml.load(f, Loader=YamlLoader)
 
-            config_data['providers'] = providers
+            # 处理providers配置（一次性校验整个字典）
+            config_data['providers'] = _PROVIDERS_ADAPTER.validate_python(
+                config_data.get('providers') or {}
+            )
 
             return cls(**config_data)
 
@@ -129,6 +187,30 @@ class Settings(BaseSettings):
         except Exception as e:
             raise ValueError(f"加载配置文件失败: {e}")
 
+    @cached_property
+    def app_fast(self) -> AppSnapshot:
+        """应用配置快照（首次访问时生成）"""
+        return AppSnapshot(
+            name=self.app.name,
+            version=self.app.version,
+            description=self.app.description,
+            homepage=self.app.homepage,
+            debug=self.app.debug
+        )
+
+    @cached_property
+    def ai_fast(self) -> AISnapshot:
+        """AI服务配置快照（首次访问时生成）"""
+        return AISnapshot(
+            default_provider=self.ai.default_provider,
+            timeout=self.ai.timeout,
+            max_retries=self.ai.max_retries,
+            retry_delay=self.ai.retry_delay,
+            speculative=self.ai.speculative,
+            enable_batching=self.ai.enable_batching,
+            parallel_fallback=self.ai.parallel_fallback
+        )
+
     def get_provider_config(self, provider_name: str) -> Optional[ProviderConfig]:
         """获取指定提供商配置"""
         return self.providers.get(provider_name)
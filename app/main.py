@@ -5,39 +5,81 @@ FastAPI应用主模块
 
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.openapi.docs import get_swagger_ui_html
 import uvicorn
+import anyio.to_thread
 import json
+import logging
 import os
+import time
 from contextlib import asynccontextmanager
 
 from .config import get_settings
 from .models.database import init_database, db_manager
 from .api.routes import query
+from .api.dependencies import init_ai_state
+from .api.responses import ORJSONResponse
+from .utils.ai_providers.http import close_client, open_clients
 from .models.schemas import ErrorResponse
+from .services.answer_writer import answer_writer
+from .services.batcher import ai_batcher
+from .services.semantic_cache import semantic_cache
+from .utils.logger import setup_logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    import uvloop  # noqa: F401  Windows 平台没有 uvloop
+    EVENT_LOOP = "uvloop"
+except ImportError:
+    EVENT_LOOP = "asyncio"
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """应用生命周期管理"""
     # 启动时执行
-    print("正在启动AI智能题库系统...")
+    settings = get_settings()
+    log_listener = setup_logging(settings.logging)
+    logger.info("正在启动AI智能题库系统...")
+
+    # 扩大工作线程池，避免同步依赖和处理函数排队
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.server.thread_pool_size
 
     # 初始化数据库
-    if not init_database():
-        print("数据库初始化失败")
+    if not await init_database():
+        logger.error("数据库初始化失败")
+        log_listener.stop()
         raise Exception("数据库初始化失败")
 
-    print("数据库初始化成功")
-    print("AI智能题库系统启动完成")
+    logger.info("数据库初始化成功")
+
+    # 缓存AI提供商工厂与提供商信息
+    init_ai_state(app)
+
+    # 创建可用提供商共享的AI请求客户端（提供商通过 get_client() 取得同一实例，关闭时统一释放）
+    open_clients(provider.ca_bundle for provider in app.state.ai_factory.get_available_providers().values())
+
+    # 加载语义缓存（未启用时直接返回）
+    await anyio.to_thread.run_sync(semantic_cache.load)
+
+    # 启动后台答案批量写入
+    answer_writer.start()
+
+    logger.info("AI智能题库系统启动完成")
 
     yield
 
     # 关闭时执行
-    print("正在关闭AI智能题库系统...")
-    db_manager.close()
-    print("系统已安全关闭")
+    logger.info("正在关闭AI智能题库系统...")
+    await answer_writer.stop()
+    await ai_batcher.close()
+    await anyio.to_thread.run_sync(semantic_cache.save)
+    await close_client()
+    await db_manager.close()
+    logger.info("系统已安全关闭")
+    log_listener.stop()
 
 
 def create_app() -> FastAPI:
@@ -53,6 +95,7 @@ def create_app() -> FastAPI:
         version=settings.app.version,
         docs_url="/docs",
         redoc_url="/redoc",
+        default_response_class=ORJSONResponse,
         lifespan=lifespan
     )
 
@@ -65,6 +108,13 @@ def create_app() -> FastAPI:
         allow_headers=settings.security.cors_headers,
     )
 
+    # 压缩较大的JSON响应；在日志中间件之前注册，日志记录的是压缩后的响应
+    app.add_middleware(
+        GZipMiddleware,
+        minimum_size=settings.server.gzip_min_size,
+        compresslevel=settings.server.gzip_level
+    )
+
     # 注册路由
     app.include_router(query.router)
 
@@ -83,7 +133,7 @@ def register_exception_handlers(app: FastAPI):
     @app.exception_handler(HTTPException)
     async def http_exception_handler(request: Request, exc: HTTPException):
         """HTTP异常处理"""
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=exc.status_code,
             content=exc.detail if isinstance(exc.detail, dict) else {
                 "success": False,
@@ -95,8 +145,8 @@ def register_exception_handlers(app: FastAPI):
     @app.exception_handler(Exception)
     async def general_exception_handler(request: Request, exc: Exception):
         """通用异常处理"""
-        print(f"未处理的异常: {str(exc)}")
-        return JSONResponse(
+        logger.error("未处理的异常: %s", exc, exc_info=exc)
+        return ORJSONResponse(
             status_code=500,
             content={
                 "success": False,
@@ -106,22 +156,47 @@ def register_exception_handlers(app: FastAPI):
         )
 
 
-def register_middleware(app: FastAPI):
-    """注册中间件"""
+class AccessLogMiddleware:
+    """
+    请求日志中间件（纯ASGI实现）
+
+    直接包装send捕获响应状态码，不经过BaseHTTPMiddleware的请求/响应流转换
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        start = time.perf_counter()
 
-    @app.middleware("http")
-    async def logging_middleware(request: Request, call_next):
-        """请求日志中间件"""
-        # 记录请求
-        print(f"[{request.method}] {request.url}")
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
 
-        # 处理请求
-        response = await call_next(request)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # 记录请求与响应状态
+            logger.info(
+                "[%s] %s -> %d (%.1fms)",
+                scope["method"], scope["path"], status_code,
+                (time.perf_counter() - start) * 1000
+            )
 
-        # 记录响应状态
-        print(f"[响应] {response.status_code}")
 
-        return response
+def register_middleware(app: FastAPI):
+    """注册中间件"""
+
+    # 请求日志只在调试模式下开启，生产环境不为每个请求写日志
+    if get_settings().app.debug:
+        app.add_middleware(AccessLogMiddleware)
 
 
 def print_api_config(host: str, port: int):
@@ -168,6 +243,19 @@ def create_log_directory():
         print(f"创建日志目录: {log_dir}")
 
 
+def get_worker_count() -> int:
+    """
+    计算uvicorn工作进程数
+
+    Returns:
+        int: 工作进程数（热重载只支持单进程）
+    """
+    server = get_settings().server
+    if server.reload:
+        return 1
+    return server.workers or os.cpu_count() or 1
+
+
 # 创建应用实例
 app = create_app()
 
@@ -183,12 +271,15 @@ if __name__ == "__main__":
     host = settings.server.host
     port = settings.server.port
     reload = settings.server.reload
+    workers = get_worker_count()
 
     # 打印配置信息
     display_host = "127.0.0.1" if host == "0.0.0.0" else host
     print(f"启动FastAPI服务器")
     print(f"地址: http://{display_host}:{port}")
     print(f"热重载: {'开启' if reload else '关闭'}")
+    print(f"工作进程: {workers}")
+    print(f"事件循环: {EVENT_LOOP}")
     print(f"调试模式: {'开启' if settings.app.debug else '关闭'}")
 
     # 打印API配置
@@ -200,5 +291,9 @@ if __name__ == "__main__":
         host=host,
         port=port,
         reload=reload,
-        log_level=settings.logging.lower()
+        workers=workers,
+        log_level=settings.logging.level.lower(),
+        access_log=False,
+        loop=EVENT_LOOP,
+        http="httptools"
     )
\ No newline at end of file
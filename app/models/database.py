@@ -1,27 +1,123 @@
 """
 数据库模块
-使用SQLAlchemy ORM进行数据库操作
+使用SQLAlchemy异步ORM进行数据库操作
 """
 
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, func
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy import (
+    BigInteger, Column, Integer, String, Text, DateTime,
+    bindparam, event, func, inspect, lambda_stmt, select, text
+)
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
 from sqlalchemy.pool import StaticPool
-from typing import Optional, Generator
+from cachetools import TTLCache
+from typing import AsyncGenerator, List, Optional, Tuple
+import hashlib
+import logging
 import os
+import sqlite3
+import threading
 
 from ..config import get_settings
 
+logger = logging.getLogger(__name__)
+
 # 创建基础模型类
 Base = declarative_base()
 
+# 同步驱动URL前缀 -> 异步驱动URL前缀
+_ASYNC_DRIVERS = {
+    "sqlite:///": "sqlite+aiosqlite:///",
+    "postgresql://": "postgresql+asyncpg://",
+}
+
+# SQLite连接初始化PRAGMA：WAL日志、内存临时表、64MB页缓存、256MB内存映射
+_SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA mmap_size=268435456",
+)
+
+# SQLite全文索引：trigram分词可匹配中文任意子串，外部内容表由触发器与主表保持同步
+_SQLITE_FTS_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS question_answer_fts USING fts5("
+    "question, content='question_answer', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS question_answer_fts_ai AFTER INSERT ON question_answer BEGIN "
+    "INSERT INTO question_answer_fts(rowid, question) VALUES (new.id, new.question); END",
+    "CREATE TRIGGER IF NOT EXISTS question_answer_fts_ad AFTER DELETE ON question_answer BEGIN "
+    "INSERT INTO question_answer_fts(question_answer_fts, rowid, question) "
+    "VALUES ('delete', old.id, old.question); END",
+    "CREATE TRIGGER IF NOT EXISTS question_answer_fts_au AFTER UPDATE OF question ON question_answer BEGIN "
+    "INSERT INTO question_answer_fts(question_answer_fts, rowid, question) "
+    "VALUES ('delete', old.id, old.question); "
+    "INSERT INTO question_answer_fts(rowid, question) VALUES (new.id, new.question); END",
+)
+
+# trigram分词要求关键词至少3个字符，更短的关键词回退到LIKE查询
+_FTS_MIN_KEYWORD_LENGTH = 3
+
+# 支持 INSERT ... ON CONFLICT DO UPDATE 的方言（SQLite 3.24 起支持）
+_UPSERT_INSERTS = {"postgresql": postgresql_insert}
+if sqlite3.sqlite_version_info >= (3, 24, 0):
+    _UPSERT_INSERTS["sqlite"] = sqlite_insert
+
+# 支持 INSERT ... RETURNING 的方言（SQLite 3.35 起支持），其余方言写入后再查询一次
+_RETURNING_DIALECTS = {"postgresql"}
+if sqlite3.sqlite_version_info >= (3, 35, 0):
+    _RETURNING_DIALECTS.add("sqlite")
+
+
+def to_async_url(url: str) -> str:
+    """
+    将同步数据库URL转换为异步驱动URL
+
+    Args:
+        url: 配置中的数据库URL
+
+    Returns:
+        str: 异步驱动的数据库URL
+    """
+    for prefix, async_prefix in _ASYNC_DRIVERS.items():
+        if url.startswith(prefix):
+            return async_prefix + url[len(prefix):]
+    return url
+
+
+def question_hash(question: str) -> int:
+    """
+    计算问题内容的64位哈希（有符号整数，可直接存入BIGINT列）
+
+    Args:
+        question: 问题内容
+
+    Returns:
+        int: 64位哈希值
+    """
+    digest = hashlib.blake2b(question.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """新建SQLite连接时应用PRAGMA设置"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in _SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
 
 class QuestionAnswer(Base):
     """问题答案表模型"""
     __tablename__ = "question_answer"
 
     id = Column(Integer, primary_key=True, autoincrement=True, comment="记录ID")
-    question = Column(String(1000), nullable=False, comment="问题内容")
+    question = Column(String(1000), nullable=False, unique=True, index=True, comment="问题内容")
+    question_hash = Column(BigInteger, nullable=False, index=True, comment="问题内容哈希（用于定长索引查找）")
     answer = Column(Text, nullable=False, comment="答案内容")
     options = Column(Text, default="", comment="选项内容")
     type = Column(String(50), default="", comment="问题类型")
@@ -31,6 +127,25 @@ class QuestionAnswer(Base):
         return f"<QuestionAnswer(id={self.id}, question='{self.question[:50]}...')>"
 
 
+# 仓储常用查询语句：模块加载时构造一次，编译结果由SQLAlchemy按语句缓存复用
+_SELECT_BY_HASH = lambda_stmt(
+    lambda: select(QuestionAnswer).where(QuestionAnswer.question_hash == bindparam("question_hash"))
+)
+_COUNT_ALL = lambda_stmt(lambda: select(func.count()).select_from(QuestionAnswer))
+_LIST_RECENT = lambda_stmt(
+    lambda: select(QuestionAnswer).order_by(QuestionAnswer.created_at.desc()).limit(bindparam("limit"))
+)
+
+_SEARCH_FTS = select(QuestionAnswer).from_statement(text(
+    "SELECT question_answer.* FROM question_answer "
+    "JOIN question_answer_fts ON question_answer_fts.rowid = question_answer.id "
+    "WHERE question_answer_fts MATCH :keyword ORDER BY question_answer_fts.rank LIMIT :limit"
+))
+
+# 重新加载会话中已存在对象的执行选项
+_REFRESH_OPTIONS = {"populate_existing": True}
+
+
 class DatabaseManager:
     """数据库管理器"""
 
@@ -38,107 +153,302 @@ class DatabaseManager:
         self.settings = get_settings()
         self.engine = None
         self.SessionLocal = None
+        self.fulltext_enabled = False
         self._initialize_engine()
 
-    def _initialize_engine(self):
-        """初始化数据库引擎"""
+    def _initialize_engine(self, url: Optional[str] = None):
+        """
+        初始化数据库引擎
+
+        Args:
+            url: 数据库URL，为None时使用配置中的URL
+        """
         try:
             # 获取数据库配置
             db_config = self.settings.database
-
-            # 创建数据库目录（如果不存在）
-            db_path = db_config.url.replace("sqlite:///", "")
-            db_dir = os.path.dirname(db_path)
-            if db_dir and not os.path.exists(db_dir):
-                os.makedirs(db_dir, exist_ok=True)
+            url = to_async_url(url or db_config.url)
 
             # 创建引擎
-            if db_config.url.startswith("sqlite"):
-                # SQLite特殊配置
-                self.engine = create_engine(
-                    db_config.url,
-                    echo=db_config.echo,
-                    poolclass=StaticPool,
-                    connect_args={
-                        "check_same_thread": False,
-                        "timeout": 20
-                    }
-                )
+            if url.startswith("sqlite"):
+                db_path = url.split(":///", 1)[-1] if ":///" in url else ""
+                in_memory = db_path in ("", ":memory:")
+
+                # 创建数据库目录（如果不存在）
+                db_dir = os.path.dirname(db_path)
+                if db_dir and not os.path.exists(db_dir):
+                    os.makedirs(db_dir, exist_ok=True)
+
+                if in_memory:
+                    # 内存数据库只能共享同一个连接
+                    self.engine = create_async_engine(
+                        url,
+                        echo=db_config.echo,
+                        poolclass=StaticPool
+                    )
+                else:
+                    # 文件数据库使用连接池，每个连接初始化时应用PRAGMA
+                    self.engine = create_async_engine(
+                        url,
+                        echo=db_config.echo,
+                        pool_size=db_config.pool_size,
+                        max_overflow=db_config.max_overflow,
+                        connect_args={"timeout": 20}
+                    )
+                    event.listen(self.engine.sync_engine, "connect", _apply_sqlite_pragmas)
             else:
                 # 其他数据库配置
-                self.engine = create_engine(
-                    db_config.url,
+                self.engine = create_async_engine(
+                    url,
                     echo=db_config.echo,
                     pool_size=db_config.pool_size,
                     max_overflow=db_config.max_overflow
                 )
 
+            if self.engine.dialect.name == "sqlite" and "sqlite" not in _RETURNING_DIALECTS:
+                logger.info(
+                    "SQLite %s 不支持 RETURNING（需要3.35+），写入后将再查询一次记录",
+                    sqlite3.sqlite_version
+                )
+
             # 创建会话工厂
-            self.SessionLocal = sessionmaker(
-                autocommit=False,
+            self.SessionLocal = async_sessionmaker(
+                bind=self.engine,
+                class_=AsyncSession,
                 autoflush=False,
-                bind=self.engine
+                expire_on_commit=False
             )
 
-            print(f"[数据库] 数据库引擎初始化成功: {db_config.url}")
+            logger.info("数据库引擎初始化成功: %s", url)
 
         except Exception as e:
-            print(f"[数据库] 数据库引擎初始化失败: {str(e)}")
+            logger.exception("数据库引擎初始化失败: %s", e)
             raise
 
-    def create_tables(self):
+    async def reconfigure(self, url: str):
+        """
+        改用另一个数据库（关闭原引擎的连接池，重新创建引擎和会话工厂）
+
+        Args:
+            url: 新的数据库URL
+        """
+        if self.engine is not None:
+            await self.engine.dispose()
+        # 全文索引是否可用由新数据库建表时重新检测
+        self.fulltext_enabled = False
+        self._initialize_engine(url)
+
+    async def create_tables(self):
         """创建所有表"""
         try:
-            Base.metadata.create_all(bind=self.engine)
-            print("[数据库] 数据库表创建成功")
+            async with self.engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+                await self._migrate_schema(conn)
+            logger.info("数据库表创建成功")
         except Exception as e:
-            print(f"[数据库] 数据库表创建失败: {str(e)}")
+            logger.exception("数据库表创建失败: %s", e)
             raise
 
-    def get_session(self) -> Generator[Session, None, None]:
-        """获取数据库会话（依赖注入用）"""
-        db = self.SessionLocal()
+    async def _migrate_schema(self, conn: AsyncConnection):
+        """
+        升级旧版本创建的表结构
+
+        create_all不会修改已存在的表，这里补齐新版本增加的索引和列
+
+        Args:
+            conn: 数据库连接
+        """
+        table = QuestionAnswer.__tablename__
+        indexes, columns = await conn.run_sync(
+            lambda sync_conn: (
+                inspect(sync_conn).get_indexes(table),
+                [column["name"] for column in inspect(sync_conn).get_columns(table)]
+            )
+        )
+
+        if not any(index["column_names"] == ["question"] and index["unique"] for index in indexes):
+            await self._migrate_unique_question(conn)
+        if "question_hash" not in columns:
+            await self._migrate_question_hash(conn)
+        if conn.dialect.name == "sqlite":
+            await self._setup_sqlite_fulltext(conn)
+
+    async def _migrate_unique_question(self, conn: AsyncConnection):
+        """为question列补建唯一索引（建索引前按问题去重，保留最新的一条记录）"""
+        result = await conn.execute(text(
+            "DELETE FROM question_answer WHERE id NOT IN "
+            "(SELECT MAX(id) FROM question_answer GROUP BY question)"
+        ))
+        if result.rowcount:
+            logger.warning("已清理重复问题记录: %d 条", result.rowcount)
+
+        await conn.execute(text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS ix_question_answer_question "
+            "ON question_answer (question)"
+        ))
+        logger.info("已为question列创建唯一索引")
+
+    async def _migrate_question_hash(self, conn: AsyncConnection):
+        """新增question_hash列，为已有记录回填哈希并建立索引"""
+        await conn.execute(text(
+            "ALTER TABLE question_answer ADD COLUMN question_hash BIGINT NOT NULL DEFAULT 0"
+        ))
+
+        rows = (await conn.execute(text("SELECT id, question FROM question_answer"))).all()
+        if rows:
+            await conn.execute(
+                text("UPDATE question_answer SET question_hash = :hash WHERE id = :id"),
+                [{"id": row.id, "hash": question_hash(row.question)} for row in rows]
+            )
+
+        await conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_question_answer_question_hash "
+            "ON question_answer (question_hash)"
+        ))
+        logger.info("已新增question_hash列并回填 %d 条记录", len(rows))
+
+    async def _setup_sqlite_fulltext(self, conn: AsyncConnection):
+        """创建FTS5全文索引表和同步触发器，首次创建时为已有记录建立索引"""
+        exists = await conn.scalar(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'question_answer_fts'"
+        ))
         try:
-            yield db
+            async with conn.begin_nested():
+                for ddl in _SQLITE_FTS_DDL:
+                    await conn.execute(text(ddl))
+                if not exists:
+                    await conn.execute(text(
+                        "INSERT INTO question_answer_fts(question_answer_fts) VALUES ('rebuild')"
+                    ))
+                    logger.info("已创建问题全文索引")
         except Exception as e:
-            db.rollback()
-            print(f"[数据库] 会话异常: {str(e)}")
-            raise
-        finally:
-            db.close()
+            # SQLite未编译FTS5或不支持trigram分词时，关键词搜索继续使用LIKE
+            logger.warning("全文索引不可用，关键词搜索将使用LIKE: %s", e)
+            return
+
+        self.fulltext_enabled = True
 
-    def get_connection(self) -> Session:
+    async def get_session(self) -> AsyncGenerator[AsyncSession, None]:
+        """获取数据库会话（依赖注入用）"""
+        async with self.SessionLocal() as db:
+            try:
+                yield db
+            except Exception as e:
+                await db.rollback()
+                logger.exception("会话异常: %s", e)
+                raise
+
+    def get_connection(self) -> AsyncSession:
         """获取数据库连接"""
         return self.SessionLocal()
 
-    def test_connection(self) -> bool:
+    async def test_connection(self) -> bool:
         """测试数据库连接"""
         try:
-            from sqlalchemy import text
-            with self.engine.connect() as connection:
-                connection.execute(text("SELECT 1"))
-            print("[数据库] 数据库连接测试成功")
+            async with self.engine.connect() as connection:
+                await connection.execute(text("SELECT 1"))
+            logger.info("数据库连接测试成功")
             return True
         except Exception as e:
-            print(f"[数据库] 数据库连接测试失败: {str(e)}")
+            logger.exception("数据库连接测试失败: %s", e)
             return False
 
-    def close(self):
-        """关闭数据库连接"""
+    async def close(self):
+        """关闭数据库连接（SQLite先执行 PRAGMA optimize，更新查询规划器的索引统计）"""
         if self.engine:
-            self.engine.dispose()
-            print("[数据库] 数据库连接已关闭")
+            if self.engine.dialect.name == "sqlite":
+                try:
+                    async with self.engine.connect() as connection:
+                        await connection.execute(text("PRAGMA optimize"))
+                except Exception as e:
+                    logger.warning("SQLite PRAGMA optimize 执行失败: %s", e)
+            await self.engine.dispose()
+            logger.info("数据库连接已关闭")
+
+
+def normalize_question(question: str) -> str:
+    """
+    规范化问题内容作为缓存键（合并连续空白、忽略大小写）
+
+    Args:
+        question: 问题内容
+
+    Returns:
+        str: 规范化后的问题内容
+    """
+    return " ".join(question.split()).casefold()
+
+
+class AnswerCache:
+    """问题答案内存缓存（线程安全，带过期时间，按问题内容的摘要索引，与数据库查找一样精确匹配）"""
+
+    def __init__(self, enabled: bool, maxsize: int, ttl: int):
+        self.enabled = enabled
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def get(self, question: str) -> Optional[QuestionAnswer]:
+        """
+        获取缓存的问题答案
+
+        Args:
+            question: 问题内容
+
+        Returns:
+            QuestionAnswer: 未绑定会话的记录副本，未命中返回None
+        """
+        if not self.enabled:
+            return None
+        key = self._key(question)
+        with self._lock:
+            cached = self._cache.get(key)
+        if cached is None:
+            return None
+        answer, options, question_type = cached
+        return QuestionAnswer(question=question, answer=answer, options=options, type=question_type)
+
+    def set(self, record: QuestionAnswer):
+        """缓存问题答案（只保存字段值，不保存ORM对象）"""
+        if not self.enabled:
+            return
+        key = self._key(record.question)
+        with self._lock:
+            self._cache[key] = (record.answer, record.options, record.type)
+
+    def invalidate(self, question: str):
+        """使指定问题的缓存失效"""
+        key = self._key(question)
+        with self._lock:
+            self._cache.pop(key, None)
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._cache.clear()
+
+    @staticmethod
+    def _key(question: str) -> bytes:
+        """缓存键：问题内容的128位blake2b摘要（定长，不在缓存中保留完整问题文本）"""
+        return hashlib.blake2b(question.encode("utf-8"), digest_size=16).digest()
+
+
+# 全局问题答案缓存
+_cache_config = get_settings().cache
+answer_cache = AnswerCache(
+    enabled=_cache_config.enabled,
+    maxsize=_cache_config.max_size,
+    ttl=_cache_config.ttl
+)
 
 
 class QuestionAnswerRepository:
     """问题答案仓储类"""
 
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    def find_by_question(self, question: str) -> Optional[QuestionAnswer]:
+    async def find_by_question(self, question: str) -> Optional[QuestionAnswer]:
         """
-        根据问题查找答案
+        根据问题查找答案（优先读取内存缓存）
 
         Args:
             question: 问题内容
@@ -146,15 +456,34 @@ class QuestionAnswerRepository:
         Returns:
             QuestionAnswer: 问题答案记录，如果不存在返回None
         """
+        cached = answer_cache.get(question)
+        if cached is not None:
+            return cached
+
         try:
-            return self.db.query(QuestionAnswer).filter(
-                QuestionAnswer.question == question
-            ).first()
+            record = await self._select_by_question(question)
         except Exception as e:
-            print(f"[数据库] 查询失败: {str(e)}")
+            logger.exception("查询失败: %s", e)
             return None
 
-    def create(self, question: str, answer: str, options: str = "", question_type: str = "") -> Optional[QuestionAnswer]:
+        if record is not None:
+            answer_cache.set(record)
+        return record
+
+    async def _select_by_question(self, question: str, refresh: bool = False) -> Optional[QuestionAnswer]:
+        """
+        从数据库查询问题记录（不经过缓存）
+
+        先按定长哈希走索引筛选，再比对完整问题内容排除哈希碰撞
+        """
+        result = await self.db.execute(
+            _SELECT_BY_HASH,
+            {"question_hash": question_hash(question)},
+            execution_options=_REFRESH_OPTIONS if refresh else {}
+        )
+        return next((record for record in result.scalars() if record.question == question), None)
+
+    async def create(self, question: str, answer: str, options: str = "", question_type: str = "") -> Optional[QuestionAnswer]:
         """
         创建新的问题答案记录
 
@@ -168,38 +497,132 @@ class QuestionAnswerRepository:
             QuestionAnswer: 创建的记录，如果创建失败返回None
         """
         try:
-            # 检查是否已存在
-            existing = self.find_by_question(question)
-            if existing:
-                print(f"[数据库] 问题已存在，更新答案: {question[:50]}...")
-                existing.answer = answer
-                existing.options = options
-                existing.type = question_type
-                self.db.commit()
-                self.db.refresh(existing)
-                return existing
-
-            # 创建新记录
-            qa_record = QuestionAnswer(
+            # 答案即将变化，先使缓存失效（写入失败时不会留下旧答案）
+            answer_cache.invalidate(question)
+
+            insert = _UPSERT_INSERTS.get(self.db.bind.dialect.name)
+            if insert is None:
+                record = await self._create_or_update(question, answer, options, question_type)
+                answer_cache.set(record)
+                return record
+
+            # 单条 INSERT ... ON CONFLICT(question) DO UPDATE 完成新增或更新
+            stmt = insert(QuestionAnswer).values(
                 question=question,
+                question_hash=question_hash(question),
                 answer=answer,
                 options=options,
                 type=question_type
             )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[QuestionAnswer.question],
+                set_={
+                    "answer": stmt.excluded.answer,
+                    "options": stmt.excluded.options,
+                    "type": stmt.excluded.type
+                }
+            )
+            if self.db.bind.dialect.name in _RETURNING_DIALECTS:
+                # RETURNING 直接带回写入后的整行，会话配置了expire_on_commit=False，提交后无需再查询
+                result = await self.db.execute(
+                    stmt.returning(QuestionAnswer),
+                    execution_options=_REFRESH_OPTIONS
+                )
+                record = result.scalar_one()
+            else:
+                await self.db.execute(stmt)
+                record = await self._select_by_question(question, refresh=True)
+            await self.db.commit()
 
-            self.db.add(qa_record)
-            self.db.commit()
-            self.db.refresh(qa_record)
-
-            print(f"[数据库] 新记录创建成功: {question[:50]}...")
-            return qa_record
+            logger.debug("记录写入成功: %.50s...", question)
+            # 写入成功后直接回填缓存，后续相同问题无需再查询数据库
+            answer_cache.set(record)
+            return record
 
         except Exception as e:
-            self.db.rollback()
-            print(f"[数据库] 创建记录失败: {str(e)}")
+            await self.db.rollback()
+            logger.exception("创建记录失败: %s", e)
             return None
 
-    def count_all(self) -> int:
+    async def create_many(self, rows: List[Tuple[str, str, str, str]]) -> int:
+        """
+        批量写入问题答案记录（一条 INSERT ... ON CONFLICT DO UPDATE）
+
+        Args:
+            rows: (问题, 答案, 选项, 问题类型) 列表，同一问题出现多次时以最后一条为准
+
+        Returns:
+            int: 写入的记录数，失败返回0
+        """
+        # 按问题去重，同一条语句内不能两次更新同一行
+        latest = {row[0]: row for row in rows}
+        if not latest:
+            return 0
+
+        try:
+            insert = _UPSERT_INSERTS.get(self.db.bind.dialect.name)
+            if insert is None:
+                for question, answer, options, question_type in latest.values():
+                    await self._create_or_update(question, answer, options, question_type)
+            else:
+                stmt = insert(QuestionAnswer).values([
+                    {
+                        "question": question,
+                        "question_hash": question_hash(question),
+                        "answer": answer,
+                        "options": options,
+                        "type": question_type
+                    }
+                    for question, answer, options, question_type in latest.values()
+                ])
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[QuestionAnswer.question],
+                    set_={
+                        "answer": stmt.excluded.answer,
+                        "options": stmt.excluded.options,
+                        "type": stmt.excluded.type
+                    }
+                )
+                await self.db.execute(stmt)
+                await self.db.commit()
+
+            logger.debug("批量写入记录: %d 条", len(latest))
+            return len(latest)
+
+        except Exception as e:
+            await self.db.rollback()
+            logger.exception("批量写入记录失败: %s", e)
+            return 0
+
+    async def _create_or_update(self, question: str, answer: str, options: str, question_type: str) -> QuestionAnswer:
+        """不支持UPSERT的数据库：先查询再新增或更新"""
+        existing = await self._select_by_question(question)
+        if existing:
+            logger.debug("问题已存在，更新答案: %.50s...", question)
+            existing.answer = answer
+            existing.options = options
+            existing.type = question_type
+            await self.db.commit()
+            await self.db.refresh(existing)
+            return existing
+
+        # 创建新记录
+        qa_record = QuestionAnswer(
+            question=question,
+            question_hash=question_hash(question),
+            answer=answer,
+            options=options,
+            type=question_type
+        )
+
+        self.db.add(qa_record)
+        await self.db.commit()
+        await self.db.refresh(qa_record)
+
+        logger.debug("新记录创建成功: %.50s...", question)
+        return qa_record
+
+    async def count_all(self) -> int:
         """
         统计所有记录数量
 
@@ -207,12 +630,13 @@ class QuestionAnswerRepository:
             int: 记录总数
         """
         try:
-            return self.db.query(QuestionAnswer).count()
+            result = await self.db.execute(_COUNT_ALL)
+            return result.scalar_one()
         except Exception as e:
-            print(f"[数据库] 统计记录失败: {str(e)}")
+            logger.exception("统计记录失败: %s", e)
             return 0
 
-    def list_recent(self, limit: int = 10) -> list[QuestionAnswer]:
+    async def list_recent(self, limit: int = 10) -> list[QuestionAnswer]:
         """
         获取最近的记录
 
@@ -223,16 +647,15 @@ class QuestionAnswerRepository:
             list[QuestionAnswer]: 记录列表
         """
         try:
-            return self.db.query(QuestionAnswer).order_by(
-                QuestionAnswer.created_at.desc()
-            ).limit(limit).all()
+            result = await self.db.execute(_LIST_RECENT, {"limit": limit})
+            return list(result.scalars().all())
         except Exception as e:
-            print(f"[数据库] 获取最近记录失败: {str(e)}")
+            logger.exception("获取最近记录失败: %s", e)
             return []
 
-    def search_by_keyword(self, keyword: str, limit: int = 10) -> list[QuestionAnswer]:
+    async def search_by_keyword(self, keyword: str, limit: int = 10) -> list[QuestionAnswer]:
         """
-        根据关键词搜索问题
+        根据关键词搜索问题（SQLite使用FTS5全文索引，按相关度排序）
 
         Args:
             keyword: 搜索关键词
@@ -242,11 +665,20 @@ class QuestionAnswerRepository:
             list[QuestionAnswer]: 匹配的记录列表
         """
         try:
-            return self.db.query(QuestionAnswer).filter(
-                QuestionAnswer.question.contains(keyword)
-            ).order_by(QuestionAnswer.created_at.desc()).limit(limit).all()
+            if db_manager.fulltext_enabled and len(keyword) >= _FTS_MIN_KEYWORD_LENGTH:
+                # 关键词作为短语匹配，转义其中的双引号
+                phrase = '"' + keyword.replace('"', '""') + '"'
+                result = await self.db.execute(_SEARCH_FTS, {"keyword": phrase, "limit": limit})
+            else:
+                result = await self.db.execute(
+                    select(QuestionAnswer)
+                    .where(QuestionAnswer.question.contains(keyword))
+                    .order_by(QuestionAnswer.created_at.desc())
+                    .limit(limit)
+                )
+            return list(result.scalars().all())
         except Exception as e:
-            print(f"[数据库] 搜索失败: {str(e)}")
+            logger.exception("搜索失败: %s", e)
             return []
 
 
@@ -254,30 +686,42 @@ class QuestionAnswerRepository:
 db_manager = DatabaseManager()
 
 
-def get_db() -> Generator[Session, None, None]:
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """获取数据库会话（FastAPI依赖注入用）"""
-    yield from db_manager.get_session()
+    async for session in db_manager.get_session():
+        yield session
 
 
-def get_question_repository(db: Session) -> QuestionAnswerRepository:
+def get_question_repository(db: AsyncSession) -> QuestionAnswerRepository:
     """获取问题答案仓储（FastAPI依赖注入用）"""
     return QuestionAnswerRepository(db)
 
 
-def init_database():
-    """初始化数据库"""
+async def init_database(url: Optional[str] = None):
+    """
+    初始化数据库
+
+    Args:
+        url: 改用的数据库URL（如测试使用的 sqlite:///:memory:），为None时使用配置中的URL
+
+    Returns:
+        bool: 是否初始化成功
+    """
     try:
+        if url is not None:
+            await db_manager.reconfigure(url)
+
         # 创建表
-        db_manager.create_tables()
+        await db_manager.create_tables()
 
         # 测试连接
-        if db_manager.test_connection():
-            print("[数据库] 数据库初始化完成")
+        if await db_manager.test_connection():
+            logger.info("数据库初始化完成")
             return True
         else:
-            print("[数据库] 数据库连接测试失败")
+            logger.error("数据库连接测试失败")
             return False
 
     except Exception as e:
-        print(f"[数据库] 数据库初始化失败: {str(e)}")
-        return False
\ No newline at end of file
+        logger.exception("数据库初始化失败: %s", e)
+        return False
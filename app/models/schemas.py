@@ -4,47 +4,73 @@ Pydantic数据模型定义
 """
 
 from typing import Optional, Dict, Any, List
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, field_validator, model_validator
 from datetime import datetime
 
 
+# 支持的问题类型
+_ALLOWED_TYPES = frozenset([
+    "", "选择题", "多选题", "填空题", "判断题",
+    "judgement", "single", "multiple", "fill", "truefalse", "choice"
+])
+
+
 # 请求模型
 class QueryRequest(BaseModel):
     """查询请求模型"""
     title: str = Field(..., min_length=1, max_length=1000, description="问题标题")
-    options: Optional[str] = Field("", max_length=2000, description="选项内容")
-    type: Optional[str] = Field("", max_length=50, description="问题类型")
-
-    @validator('title')
-    def validate_title(cls, v):
-        if not v.strip():
+    options: str = Field("", max_length=2000, description="选项内容")
+    type: str = Field("", max_length=50, description="问题类型")
+
+    @field_validator("options", "type", mode="before")
+    @classmethod
+    def none_to_empty(cls, value):
+        """客户端传 null 时按空字符串处理"""
+        return "" if value is None else value
+
+    @model_validator(mode="after")
+    def normalize(self):
+        """字段校验完成后统一规范化：去除标题空白、检查问题类型"""
+        title = self.title.strip()
+        if not title:
             raise ValueError('问题标题不能为空')
-        return v.strip()
+        self.title = title
 
-    @validator('options')
-    def validate_options(cls, v):
-        if v is None:
-            return ""
-        return v
+        if self.type not in _ALLOWED_TYPES:
+            raise ValueError(f'不支持的问题类型: {self.type}')
 
-    @validator('type')
-    def validate_type(cls, v):
-        if v is None:
-            return ""
-        # 支持的问题类型
-        allowed_types = ["", "选择题", "多选题", "填空题", "判断题", "judgement", "single", "multiple", "fill", "truefalse", "choice"]
-        if v not in allowed_types:
-            raise ValueError(f'不支持的问题类型: {v}')
-        return v
+        return self
 
-    class Config:
-        schema_extra = {
+    model_config = ConfigDict(
+        extra="ignore",
+        json_schema_extra={
             "example": {
                 "title": "中国的首都是哪里？",
                 "options": "A. 北京 B. 上海 C. 广州 D. 深圳",
                 "type": "选择题"
             }
         }
+    )
+
+
+# 请求模型校验器（导入时构建一次）
+_REQUEST_ADAPTER = TypeAdapter(QueryRequest)
+
+
+def parse_query_request(data: Dict[str, Any]) -> QueryRequest:
+    """
+    校验并构造查询请求
+
+    Args:
+        data: 请求参数字典
+
+    Returns:
+        QueryRequest: 校验后的查询请求
+
+    Raises:
+        ValidationError: 参数校验失败
+    """
+    return _REQUEST_ADAPTER.validate_python(data)
 
 
 # 响应模型
@@ -54,8 +80,10 @@ class QueryResponse(BaseModel):
     data: Optional['QueryData'] = Field(None, description="查询结果数据")
     error: Optional[str] = Field(None, description="错误信息")
 
-    class Config:
-        schema_extra = {
+    model_config = ConfigDict(
+        extra="ignore",
+        frozen=True,
+        json_schema_extra={
             "example": {
                 "success": True,
                 "data": {
@@ -66,6 +94,7 @@ class QueryResponse(BaseModel):
                 }
             }
         }
+    )
 
 
 class QueryData(BaseModel):
@@ -73,23 +102,27 @@ class QueryData(BaseModel):
     code: int = Field(..., description="状态码 (0:未找到答案, 1:找到答案)")
     data: Optional[str] = Field(None, description="答案内容")
     msg: str = Field(..., description="消息说明")
-    source: str = Field(..., description="答案来源 (public:本地数据库, ai:AI回答)")
+    source: str = Field(..., description="答案来源 (public:本地数据库, ai:AI回答, system:系统异常)")
 
-    @validator('code')
+    @field_validator('code')
+    @classmethod
     def validate_code(cls, v):
         if v not in [0, 1]:
             raise ValueError('状态码只能是0或1')
         return v
 
-    @validator('source')
+    @field_validator('source')
+    @classmethod
     def validate_source(cls, v):
-        allowed_sources = ["public", "ai"]
+        allowed_sources = ["public", "ai", "system"]
         if v not in allowed_sources:
             raise ValueError(f'不支持的答案来源: {v}')
         return v
 
-    class Config:
-        schema_extra = {
+    model_config = ConfigDict(
+        extra="ignore",
+        frozen=True,
+        json_schema_extra={
             "example": {
                 "code": 1,
                 "data": "北京",
@@ -97,6 +130,10 @@ class QueryData(BaseModel):
                 "source": "ai"
             }
         }
+    )
+
+
+QueryResponse.model_rebuild()
 
 
 # 数据库模型（ORM）
@@ -109,9 +146,10 @@ class QuestionAnswerDB(BaseModel):
     type: Optional[str] = Field("", description="问题类型")
     created_at: Optional[datetime] = Field(None, description="创建时间")
 
-    class Config:
-        orm_mode = True
-        schema_extra = {
+    model_config = ConfigDict(
+        extra="ignore",
+        from_attributes=True,
+        json_schema_extra={
             "example": {
                 "id": 1,
                 "question": "中国的首都是哪里？",
@@ -121,6 +159,7 @@ class QuestionAnswerDB(BaseModel):
                 "created_at": "2024-01-01T00:00:00"
             }
         }
+    )
 
 
 # AI相关模型
@@ -132,8 +171,10 @@ class AIProviderInfo(BaseModel):
     model: str = Field(..., description="模型名称")
     is_available: bool = Field(..., description="是否可用")
 
-    class Config:
-        schema_extra = {
+    model_config = ConfigDict(
+        extra="ignore",
+        frozen=True,
+        json_schema_extra={
             "example": {
                 "name": "阿里百炼",
                 "enabled": True,
@@ -142,6 +183,7 @@ class AIProviderInfo(BaseModel):
                 "is_available": True
             }
         }
+    )
 
 
 class AIConfigResponse(BaseModel):
@@ -150,8 +192,10 @@ class AIConfigResponse(BaseModel):
     available_providers: List[AIProviderInfo] = Field(..., description="可用提供商列表")
     total_providers: int = Field(..., description="总提供商数量")
 
-    class Config:
-        schema_extra = {
+    model_config = ConfigDict(
+        extra="ignore",
+        frozen=True,
+        json_schema_extra={
             "example": {
                 "default_provider": "alibaba",
                 "available_providers": [
@@ -166,6 +210,7 @@ class AIConfigResponse(BaseModel):
                 "total_providers": 1
             }
         }
+    )
 
 
 # 系统信息模型
@@ -180,8 +225,10 @@ class SystemInfo(BaseModel):
     ai_providers_count: int = Field(..., description="AI提供商数量")
     database_status: str = Field(..., description="数据库状态")
 
-    class Config:
-        schema_extra = {
+    model_config = ConfigDict(
+        extra="ignore",
+        frozen=True,
+        json_schema_extra={
             "example": {
                 "app_name": "ZE题库(自建版)",
                 "version": "2.0.0",
@@ -193,6 +240,7 @@ class SystemInfo(BaseModel):
                 "database_status": "connected"
             }
         }
+    )
 
 
 # 错误响应模型
@@ -203,8 +251,10 @@ class ErrorResponse(BaseModel):
     error_code: Optional[str] = Field(None, description="错误代码")
     details: Optional[Dict[str, Any]] = Field(None, description="错误详情")
 
-    class Config:
-        schema_extra = {
+    model_config = ConfigDict(
+        extra="ignore",
+        frozen=True,
+        json_schema_extra={
             "example": {
                 "success": False,
                 "error": "缺少题目参数",
@@ -215,6 +265,7 @@ class ErrorResponse(BaseModel):
                 }
             }
         }
+    )
 
 
 # 健康检查模型
@@ -226,8 +277,10 @@ class HealthCheckResponse(BaseModel):
     database: str = Field(..., description="数据库状态")
     ai_providers: int = Field(..., description="可用AI提供商数量")
 
-    class Config:
-        schema_extra = {
+    model_config = ConfigDict(
+        extra="ignore",
+        frozen=True,
+        json_schema_extra={
             "example": {
                 "status": "healthy",
                 "timestamp": "2024-01-01T00:00:00",
@@ -235,4 +288,5 @@ class HealthCheckResponse(BaseModel):
                 "database": "connected",
                 "ai_providers": 2
             }
-        }
\ No newline at end of file
+        }
+    )
@@ -0,0 +1,85 @@
+"""
+msgspec响应结构定义
+服务端构造的响应数据使用msgspec.Struct，创建和JSON编码都由C实现完成；
+字段与 schemas 中同名的Pydantic模型一一对应，后者继续用于请求校验和OpenAPI文档。
+所有结构都是不可变的（frozen），实例没有__dict__
+"""
+
+from typing import Dict, List, Optional
+
+import msgspec
+
+
+class QueryData(msgspec.Struct, frozen=True):
+    """查询数据"""
+    code: int
+    data: Optional[str]
+    msg: str
+    source: str
+
+
+class QueryResponse(msgspec.Struct, frozen=True):
+    """查询响应"""
+    success: bool
+    data: Optional[QueryData] = None
+    error: Optional[str] = None
+
+
+class AIProviderInfo(msgspec.Struct, frozen=True):
+    """AI提供商信息"""
+    name: str
+    enabled: bool
+    has_api_key: bool
+    model: str
+    is_available: bool
+
+
+class AIConfigResponse(msgspec.Struct, frozen=True):
+    """AI配置响应"""
+    default_provider: str
+    available_providers: List[AIProviderInfo]
+    total_providers: int
+
+
+class SystemInfo(msgspec.Struct, frozen=True):
+    """系统信息"""
+    app_name: str
+    version: str
+    description: str
+    homepage: str
+    author: str
+    email: str
+    ai_providers_count: int
+    database_status: str
+
+
+class HealthCheckResponse(msgspec.Struct, frozen=True):
+    """健康检查响应"""
+    status: str
+    timestamp: str
+    version: str
+    database: str
+    ai_providers: int
+
+
+class RecentQuestion(msgspec.Struct, frozen=True):
+    """最近题目摘要"""
+    question: str
+    answer: str
+    created_at: Optional[str]
+
+
+class Statistics(msgspec.Struct, frozen=True):
+    """查询统计信息"""
+    total_questions: int
+    available_ai_providers: int
+    recent_questions: List[RecentQuestion]
+    ai_providers: List[str]
+
+
+class AIProvidersStatus(msgspec.Struct, frozen=True):
+    """AI提供商状态"""
+    default_provider: str
+    providers: Dict[str, AIProviderInfo]
+    total_count: int
+    available_count: int
@@ -0,0 +1,134 @@
+"""
+后台答案写入服务
+AI答案先放入内存队列，由后台任务批量写入数据库，请求路径上不再等待提交
+"""
+
+import asyncio
+import logging
+from typing import List, Optional, Tuple
+
+from ..config import get_settings
+from ..models.database import QuestionAnswer, QuestionAnswerRepository, answer_cache, db_manager
+
+logger = logging.getLogger(__name__)
+
+# 队列元素：(问题, 答案, 选项, 问题类型)
+AnswerRow = Tuple[str, str, str, str]
+
+
+class AnswerWriter:
+    """后台批量写入器"""
+
+    def __init__(self, queue_size: int, batch_size: int, flush_interval: float):
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        """后台写入任务是否在运行"""
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """启动后台写入任务（应用启动时调用）"""
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._task = asyncio.create_task(self._run())
+        logger.info("后台答案写入任务已启动")
+
+    async def stop(self):
+        """写完队列中剩余的答案后停止后台任务（应用关闭时调用）"""
+        if not self.running:
+            return
+        # 结束标记排在已有记录之后，保证剩余答案都会被写入
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+        logger.info("后台答案写入任务已停止")
+
+    def submit(self, question: str, answer: str, options: str = "", question_type: str = "") -> bool:
+        """
+        提交待写入的答案
+
+        答案会立即写入内存缓存，相同问题在落库前也能直接命中
+
+        Args:
+            question: 问题内容
+            answer: 答案内容
+            options: 选项内容
+            question_type: 问题类型
+
+        Returns:
+            bool: 是否已加入队列；后台任务未运行或队列已满时返回False，由调用方同步写入
+        """
+        if not self.running:
+            return False
+        try:
+            self._queue.put_nowait((question, answer, options, question_type))
+        except asyncio.QueueFull:
+            logger.warning("答案写入队列已满，改为同步写入")
+            return False
+
+        answer_cache.set(QuestionAnswer(question=question, answer=answer, options=options, type=question_type))
+        return True
+
+    async def _run(self):
+        """后台任务：收集一批答案（最多batch_size条或等待flush_interval秒）后批量写入"""
+        loop = asyncio.get_running_loop()
+        stopping = False
+
+        while not stopping:
+            row = await self._queue.get()
+            if row is None:
+                break
+
+            batch: List[AnswerRow] = [row]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    row = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if row is None:
+                    stopping = True
+                    break
+                batch.append(row)
+
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[AnswerRow]):
+        """
+        把一批答案写入数据库
+
+        批量写入失败时逐条重试（单条写入失败会使该问题的缓存失效）；
+        连数据库会话都无法使用时移除提交时写入的缓存，缓存中不会留下数据库里没有的答案
+        """
+        try:
+            async with db_manager.get_connection() as db:
+                repository = QuestionAnswerRepository(db)
+                if await repository.create_many(batch):
+                    return
+                logger.warning("批量写入答案失败，改为逐条写入 %d 条", len(batch))
+                for row in batch:
+                    await repository.create(*row)
+                return
+        except Exception as e:
+            logger.exception("批量写入答案失败: %s", e)
+
+        for question, *_ in batch:
+            answer_cache.invalidate(question)
+
+
+# 全局后台写入器
+_db_config = get_settings().database
+answer_writer = AnswerWriter(
+    queue_size=_db_config.write_queue_size,
+    batch_size=_db_config.write_batch_size,
+    flush_interval=_db_config.write_flush_interval
+)
@@ -0,0 +1,144 @@
+"""
+AI请求合并服务
+短时间内同时到达的多道题目合并为一次AI请求（提供商的 query_batch），
+分摊每次调用的连接、请求和提示词开销；合并回答不可用时退回逐题请求
+"""
+
+import asyncio
+import logging
+from typing import Dict, List, Optional, Set, Tuple
+
+from ..config import get_settings
+from ..utils.ai_providers.base import AIProviderBase
+
+logger = logging.getLogger(__name__)
+
+# 待合并的题目：(问题, 选项, 问题类型, 等待答案的Future)
+PendingItem = Tuple[str, str, str, asyncio.Future]
+
+
+class _Batch:
+    """同一提供商正在收集的一批题目"""
+
+    __slots__ = ("provider", "items", "timer")
+
+    def __init__(self, provider: AIProviderBase):
+        self.provider = provider
+        self.items: List[PendingItem] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class AsyncBatcher:
+    """按提供商收集题目，凑满 max_batch 道或等待 window 秒后一次性发送"""
+
+    def __init__(self, max_batch: int, window: float):
+        self.max_batch = max_batch
+        self.window = window
+        self._batches: Dict[str, _Batch] = {}
+        # 持有发送任务的引用，避免任务在完成前被回收
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def submit(self, provider: AIProviderBase, question: str, options: str = "",
+                     question_type: str = "") -> str:
+        """
+        提交题目并等待答案
+
+        Args:
+            provider: AI提供商
+            question: 问题内容
+            options: 选项内容
+            question_type: 问题类型
+
+        Returns:
+            str: AI返回的答案
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        name = provider.get_name()
+        batch = self._batches.get(name)
+        if batch is None:
+            batch = _Batch(provider)
+            batch.timer = loop.call_later(self.window, self._flush, name, batch)
+            self._batches[name] = batch
+
+        batch.items.append((question, options, question_type, future))
+        if len(batch.items) >= self.max_batch:
+            self._flush(name, batch)
+
+        return await future
+
+    def _flush(self, name: str, batch: _Batch):
+        """结束收集并在后台发送这一批题目"""
+        if self._batches.get(name) is not batch:
+            return
+        del self._batches[name]
+        batch.timer.cancel()
+
+        task = asyncio.create_task(self._send(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def close(self):
+        """取消尚在收集和发送中的批次（应用关闭时调用），等待者收到异常而不是一直挂起"""
+        batches = list(self._batches.values())
+        self._batches.clear()
+        for batch in batches:
+            batch.timer.cancel()
+            _fail_pending(batch.items)
+
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _send(self, batch: _Batch):
+        """发送一批题目，把答案分发给各个等待者"""
+        # 已经取消等待的题目不再提问
+        items = [item for item in batch.items if not item[3].done()]
+        if not items:
+            return
+
+        try:
+            await self._answer(batch.provider, items)
+        finally:
+            # 发送被取消（如应用关闭）或意外出错时，仍在等待的题目立即收到异常
+            _fail_pending(items)
+
+    async def _answer(self, provider: AIProviderBase, items: List[PendingItem]):
+        """先尝试合并请求，不可用时逐题请求"""
+        if len(items) > 1:
+            try:
+                answers = await provider.query_batch([item[:3] for item in items])
+            except Exception as e:
+                logger.warning("合并请求失败，改为逐题请求: %s", e)
+            else:
+                logger.debug("合并请求完成: %d 道题目", len(items))
+                for (_, _, _, future), answer in zip(items, answers):
+                    if not future.done():
+                        future.set_result(answer)
+                return
+
+        results = await asyncio.gather(
+            *(provider.query(question, options, question_type) for question, options, question_type, _ in items),
+            return_exceptions=True
+        )
+        for (_, _, _, future), result in zip(items, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+def _fail_pending(items: List[PendingItem]):
+    """让尚未得到答案的等待者收到异常"""
+    for _, _, _, future in items:
+        if not future.done():
+            future.set_exception(RuntimeError("AI合并请求未完成"))
+
+
+# 全局请求合并器
+_ai_config = get_settings().ai
+ai_batcher = AsyncBatcher(max_batch=_ai_config.batch_size, window=_ai_config.batch_window)
@@ -3,25 +3,75 @@
 处理问题查询的核心业务逻辑
 """
 
-from typing import Optional, Dict, Any
-from sqlalchemy.orm import Session
+import asyncio
+import logging
+from typing import Dict, Optional, Any, Tuple
 
-from ..models.schemas import QueryRequest, QueryData
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.schemas import QueryRequest
+from ..models.structs import AIProvidersStatus, QueryData, RecentQuestion, Statistics
 from ..models.database import QuestionAnswerRepository
+from ..utils.ai_providers.base import AIProviderBase
 from ..utils.ai_providers.factory import AIProviderFactory
+from ..utils.answer_text import is_valid_answer
+from .answer_writer import answer_writer
+from .batcher import ai_batcher
+from .semantic_cache import semantic_cache
 from ..config import get_settings
 
+logger = logging.getLogger(__name__)
+
+
+class _Flight:
+    """进行中的AI请求（同一问题的并发请求共享同一个任务）"""
+
+    __slots__ = ("task", "waiters", "cancelled")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+        # 最后一个等待者离开时置位（Task.cancelling() 需要 Python 3.11）
+        self.cancelled = False
+
+
+# 进行中的AI请求：(问题, 选项, 类型) -> _Flight（与数据库查找一样精确匹配问题内容）
+_INFLIGHT: Dict[Tuple[str, str, str], _Flight] = {}
+
+
+def _forget_flight(key: Tuple[str, str, str], flight: _Flight):
+    """AI请求结束后从进行中列表移除"""
+    if _INFLIGHT.get(key) is flight:
+        del _INFLIGHT[key]
+
 
 class QueryService:
     """查询服务类"""
 
-    def __init__(self, db: Session):
+    __slots__ = ("db", "repository")
+
+    # 无状态依赖在所有实例间共享，每个请求只绑定自己的数据库会话
+    settings = get_settings()
+    ai_factory = AIProviderFactory()
+
+    def __init__(self, db: AsyncSession):
         self.db = db
         self.repository = QuestionAnswerRepository(db)
-        self.settings = get_settings()
-        self.ai_factory = AIProviderFactory()
 
-    def query_answer(self, request: QueryRequest) -> QueryData:
+    @classmethod
+    def for_session(cls, db: AsyncSession) -> "QueryService":
+        """
+        为数据库会话创建查询服务
+
+        Args:
+            db: 数据库会话
+
+        Returns:
+            QueryService: 查询服务实例
+        """
+        return cls(db)
+
+    async def query_answer(self, request: QueryRequest) -> QueryData:
         """
         查询问题答案
 
@@ -29,15 +79,20 @@ class QueryService:
             request: 查询请求
 
         Returns:
-            QueryData: 查询结果数据
+            QueryData: 查询结果数据（msgspec结构，服务端构造不再经过校验）
         """
+        ai_task = None
         try:
-            print(f"[查询服务] 开始查询: {request.title[:50]}...")
+            logger.debug("开始查询: %.50s...", request.title)
+
+            # 推测执行：与本地查询并行提前发起AI请求
+            if self.settings.ai_fast.speculative:
+                ai_task = asyncio.create_task(self._query_ai_shared(request))
 
             # 1. 首先查询本地数据库
-            local_answer = self._query_local_database(request.title)
+            local_answer = await self._query_local_database(request.title)
             if local_answer:
-                print(f"[查询服务] 从本地数据库找到答案")
+                logger.debug("从本地数据库找到答案")
                 return QueryData(
                     code=1,
                     data=local_answer.answer,
@@ -46,12 +101,12 @@ class QueryService:
                 )
 
             # 2. 使用AI查询
-            ai_answer = self._query_ai_provider(request)
+            ai_answer = await (ai_task if ai_task is not None else self._query_ai_shared(request))
             if ai_answer and self._is_valid_answer(ai_answer):
-                print(f"[查询服务] AI返回有效答案")
+                logger.debug("AI返回有效答案")
 
                 # 3. 保存到数据库
-                self._save_to_database(request, ai_answer)
+                await self._save_to_database(request, ai_answer)
 
                 return QueryData(
                     code=1,
@@ -60,7 +115,7 @@ class QueryService:
                     source="ai"
                 )
             else:
-                print(f"[查询服务] AI未返回有效答案")
+                logger.debug("AI未返回有效答案")
                 return QueryData(
                     code=0,
                     data=None,
@@ -69,7 +124,7 @@ class QueryService:
                 )
 
         except Exception as e:
-            print(f"[查询服务] 查询过程发生异常: {str(e)}")
+            logger.exception("查询过程发生异常: %s", e)
             return QueryData(
                 code=0,
                 data=None,
@@ -77,7 +132,12 @@ class QueryService:
                 source="system"
             )
 
-    def _query_local_database(self, question: str) -> Optional[Any]:
+        finally:
+            # 本地命中或发生异常时取消尚未完成的推测AI请求
+            if ai_task is not None and not ai_task.done():
+                ai_task.cancel()
+
+    async def _query_local_database(self, question: str) -> Optional[Any]:
         """
         查询本地数据库
 
@@ -88,12 +148,51 @@ class QueryService:
             数据库记录或None
         """
         try:
-            return self.repository.find_by_question(question)
+            return await self.repository.find_by_question(question)
         except Exception as e:
-            print(f"[查询服务] 数据库查询失败: {str(e)}")
+            logger.warning("数据库查询失败: %s", e)
             return None
 
-    def _query_ai_provider(self, request: QueryRequest) -> Optional[str]:
+    async def _query_ai_shared(self, request: QueryRequest) -> Optional[str]:
+        """
+        使用AI提供商查询答案（合并并发的相同请求）
+
+        相同问题同时只发起一次AI请求，其余请求等待同一结果；
+        所有等待者都取消时才取消AI请求
+
+        Args:
+            request: 查询请求
+
+        Returns:
+            AI返回的答案或None
+        """
+        key = (request.title, request.options, request.type)
+
+        # 事件循环单线程执行，查找与登记之间没有await，无需加锁；
+        # 已被取消（尚未触发完成回调）的请求不再复用
+        flight = _INFLIGHT.get(key)
+        if flight is not None and (flight.cancelled or flight.task.cancelled()):
+            _forget_flight(key, flight)
+            flight = None
+        if flight is None:
+            flight = _Flight(asyncio.create_task(self._query_ai_provider(request)))
+            _INFLIGHT[key] = flight
+            flight.task.add_done_callback(lambda _: _forget_flight(key, flight))
+        else:
+            logger.debug("复用进行中的AI请求: %.50s...", request.title)
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # 立即移除，之后到达的相同问题重新发起请求，不会等到已取消的任务
+                _forget_flight(key, flight)
+                flight.cancelled = True
+                flight.task.cancel()
+
+    async def _query_ai_provider(self, request: QueryRequest) -> Optional[str]:
         """
         使用AI提供商查询答案
 
@@ -104,26 +203,94 @@ class QueryService:
             AI返回的答案或None
         """
         try:
+            # 并行兜底：同时向所有可用提供商提问
+            if self.settings.ai_fast.parallel_fallback:
+                providers = self.ai_factory.get_providers_by_priority()
+                if len(providers) > 1:
+                    return await self._race_providers(providers, request)
+
             # 获取默认AI提供商
             provider = self.ai_factory.get_default_provider()
             if not provider:
-                print(f"[查询服务] 没有可用的AI提供商")
+                logger.warning("没有可用的AI提供商")
                 return None
 
-            print(f"[查询服务] 使用AI提供商: {provider.get_name()}")
+            return await self._ask_provider(provider, request)
 
-            # 调用AI查询
-            answer = provider.query(
+        except Exception as e:
+            logger.warning("AI查询失败: %s", e)
+            return None
+
+    async def _race_providers(self, providers: Tuple[AIProviderBase, ...],
+                              request: QueryRequest) -> Optional[str]:
+        """
+        同时向多个提供商提问，返回最先得到的有效答案并取消其余请求
+
+        Args:
+            providers: 可用提供商（默认提供商在前）
+            request: 查询请求
+
+        Returns:
+            最先返回的有效答案，所有提供商都没有有效答案时返回None
+        """
+        tasks = [asyncio.create_task(self._ask_provider(provider, request)) for provider in providers]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    answer = await next_done
+                except Exception as e:
+                    logger.warning("AI查询失败: %s", e)
+                    continue
+                if is_valid_answer(answer):
+                    return answer
+            logger.debug("所有AI提供商都未返回有效答案")
+            return None
+        finally:
+            # 已得到答案或请求被取消时，取消其余提供商的HTTP请求
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def _ask_provider(self, provider: AIProviderBase, request: QueryRequest) -> str:
+        """
+        向指定提供商提问（先查语义缓存，有效答案写回语义缓存）
+
+        Args:
+            provider: AI提供商
+            request: 查询请求
+
+        Returns:
+            AI返回的答案
+        """
+        logger.debug("使用AI提供商: %s", provider.get_name())
+
+        # 相似问题已有答案时直接复用
+        vector = None
+        if semantic_cache.enabled:
+            cached, vector = await semantic_cache.lookup(
+                provider.get_name(), provider.model, request.title, request.options, request.type
+            )
+            if cached is not None:
+                logger.debug("语义缓存命中: %.50s...", request.title)
+                return cached
+
+        # 调用AI查询（异步HTTP请求，不阻塞事件循环；开启批量提问时与同时到达的题目合并请求）
+        if self.settings.ai_fast.enable_batching:
+            answer = await ai_batcher.submit(provider, request.title, request.options, request.type)
+        else:
+            answer = await provider.query(
                 question=request.title,
-                options=request.options or "",
-                question_type=request.type or ""
+                options=request.options,
+                question_type=request.type
             )
 
-            return answer
+        if semantic_cache.enabled and is_valid_answer(answer):
+            semantic_cache.add(
+                provider.get_name(), provider.model, request.title, request.options, request.type,
+                answer, vector
+            )
 
-        except Exception as e:
-            print(f"[查询服务] AI查询失败: {str(e)}")
-            return None
+        return answer
 
     def _is_valid_answer(self, answer: str) -> bool:
         """
@@ -135,86 +302,68 @@ class QueryService:
         Returns:
             bool: 答案是否有效
         """
-        if not answer or not answer.strip():
-            return False
-
-        # 检查是否包含错误信息
-        error_keywords = [
-            "API调用失败",
-            "无法从API获取答案",
-            "API请求异常",
-            "调用失败",
-            "解析失败",
-            "超时",
-            "错误"
-        ]
-
-        answer_lower = answer.lower()
-        for keyword in error_keywords:
-            if keyword in answer_lower:
-                return False
-
-        return True
+        return is_valid_answer(answer)
 
-    def _save_to_database(self, request: QueryRequest, answer: str):
+    async def _save_to_database(self, request: QueryRequest, answer: str):
         """
-        保存答案到数据库
+        保存答案到数据库（优先交给后台批量写入）
 
         Args:
             request: 查询请求
             answer: 答案内容
         """
+        if answer_writer.submit(request.title, answer, request.options, request.type):
+            logger.debug("答案已加入后台写入队列")
+            return
+
+        # 后台写入任务未运行或队列已满时同步写入
         try:
-            self.repository.create(
+            await self.repository.create(
                 question=request.title,
                 answer=answer,
-                options=request.options or "",
-                question_type=request.type or ""
+                options=request.options,
+                question_type=request.type
             )
-            print(f"[查询服务] 答案已保存到数据库")
+            logger.debug("答案已保存到数据库")
         except Exception as e:
-            print(f"[查询服务] 保存到数据库失败: {str(e)}")
+            logger.exception("保存到数据库失败: %s", e)
 
-    def get_statistics(self) -> Dict[str, Any]:
+    async def get_statistics(self) -> Statistics:
         """
         获取查询统计信息
 
         Returns:
-            Dict: 统计信息
+            Statistics: 统计信息
         """
         try:
-            total_questions = self.repository.count_all()
-            recent_questions = self.repository.list_recent(5)
-
-            # 获取AI提供商信息
-            ai_providers_info = self.ai_factory.get_provider_info()
-            available_providers = [
-                name for name, info in ai_providers_info.items()
-                if info["is_available"]
-            ]
-
-            return {
-                "total_questions": total_questions,
-                "available_ai_providers": len(available_providers),
-                "recent_questions": [
-                    {
-                        "question": q.question[:100] + "..." if len(q.question) > 100 else q.question,
-                        "answer": q.answer[:50] + "..." if len(q.answer) > 50 else q.answer,
-                        "created_at": q.created_at.isoformat() if q.created_at else None
-                    }
+            total_questions = await self.repository.count_all()
+            recent_questions = await self.repository.list_recent(5)
+
+            # 获取可用的AI提供商（预热时计算）
+            available_providers = self.ai_factory.get_available_names()
+
+            return Statistics(
+                total_questions=total_questions,
+                available_ai_providers=len(available_providers),
+                recent_questions=[
+                    RecentQuestion(
+                        question=q.question[:100] + "..." if len(q.question) > 100 else q.question,
+                        answer=q.answer[:50] + "..." if len(q.answer) > 50 else q.answer,
+                        created_at=q.created_at.isoformat() if q.created_at else None
+                    )
                     for q in recent_questions
                 ],
-                "ai_providers": available_providers
-            }
+                ai_providers=list(available_providers)
+            )
 
         except Exception as e:
-            print(f"[查询服务] 获取统计信息失败: {str(e)}")
-            return {
-                "total_questions": 0,
-                "available_ai_providers": 0,
-                "recent_questions": [],
-                "ai_providers": []
-            }
+            logger.exception("获取统计信息失败: %s", e)
+            return Statistics(
+                total_questions=0,
+                available_ai_providers=0,
+                recent_questions=[],
+                ai_providers=[]
+            )
 
     def switch_ai_provider(self, provider_name: str) -> bool:
         """
@@ -230,43 +379,40 @@ class QueryService:
             # 检查提供商是否存在且可用
             provider = self.ai_factory.create_provider(provider_name)
             if not provider or not provider.is_enabled():
-                print(f"[查询服务] 提供商不可用: {provider_name}")
+                logger.warning("提供商不可用: %s", provider_name)
                 return False
 
             # 这里可以实现动态切换配置的逻辑
-            print(f"[查询服务] 已切换到AI提供商: {provider_name}")
+            logger.info("已切换到AI提供商: %s", provider_name)
             return True
 
         except Exception as e:
-            print(f"[查询服务] 切换AI提供商失败: {str(e)}")
+            logger.exception("切换AI提供商失败: %s", e)
             return False
 
-    def get_ai_providers_status(self) -> Dict[str, Any]:
+    def get_ai_providers_status(self) -> AIProvidersStatus:
         """
         获取AI提供商状态
 
         Returns:
-            Dict: AI提供商状态信息
+            AIProvidersStatus: AI提供商状态信息
         """
         try:
             providers_info = self.ai_factory.get_provider_info()
-            default_provider = self.settings.ai.default_provider
-
-            return {
-                "default_provider": default_provider,
-                "providers": providers_info,
-                "total_count": len(providers_info),
-                "available_count": len([
-                    name for name, info in providers_info.items()
-                    if info["is_available"]
-                ])
-            }
+            default_provider = self.settings.ai_fast.default_provider
+
+            return AIProvidersStatus(
+                default_provider=default_provider,
+                providers=dict(providers_info),
+                total_count=len(providers_info),
+                available_count=len(self.ai_factory.get_available_names())
+            )
 
         except Exception as e:
-            print(f"[查询服务] 获取AI提供商状态失败: {str(e)}")
-            return {
-                "default_provider": "",
-                "providers": {},
-                "total_count": 0,
-                "available_count": 0
-            }
\ No newline at end of file
+            logger.exception("获取AI提供商状态失败: %s", e)
+            return AIProvidersStatus(
+                default_provider="",
+                providers={},
+                total_count=0,
+                available_count=0
+            )
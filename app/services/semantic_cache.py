@@ -0,0 +1,201 @@
+"""
+语义缓存服务
+相似的问题（空白、标点或措辞略有不同）直接复用已有的AI答案，不再调用AI：
+先按 (提供商, 模型, 规范化问题) 精确查找，未命中时用句向量在HNSW索引中查找最近邻。
+依赖 sentence-transformers 与 hnswlib（可选），未安装时语义缓存保持关闭
+"""
+
+import hashlib
+import logging
+import os
+from typing import Any, List, Optional, Tuple
+
+import anyio.to_thread
+import orjson
+from cachetools import LRUCache
+
+from ..config import get_settings
+from ..config.settings import SemanticCacheConfig
+from ..models.database import normalize_question
+
+try:
+    import hnswlib
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    hnswlib = None
+    SentenceTransformer = None
+
+logger = logging.getLogger(__name__)
+
+# 持久化文件名
+_INDEX_FILE = "index.bin"
+_META_FILE = "meta.json"
+
+# 每次查询的候选近邻数（最近邻的提供商或题型不匹配时继续检查后面的候选）
+_CANDIDATES = 4
+
+# 索引条目：(精确键, 范围"提供商|模型|规范化选项", 问题类型, 答案)，下标即HNSW标签
+Entry = Tuple[str, str, str, str]
+
+
+class SemanticCache:
+    """语义缓存（索引只在事件循环中读写，句向量计算放到工作线程）"""
+
+    def __init__(self, config: SemanticCacheConfig):
+        self.config = config
+        self._model: Any = None
+        self._index: Any = None
+        self._entries: List[Entry] = []
+        self._exact: LRUCache = LRUCache(maxsize=config.max_elements)
+
+    @property
+    def enabled(self) -> bool:
+        """模型和索引是否已加载"""
+        return self._index is not None
+
+    def load(self):
+        """加载句向量模型和已保存的索引（应用启动时在工作线程中调用）"""
+        if not self.config.enabled or self.enabled:
+            return
+        if hnswlib is None or SentenceTransformer is None:
+            logger.warning("语义缓存需要安装 sentence-transformers 和 hnswlib，已禁用")
+            return
+
+        model = SentenceTransformer(self.config.model)
+        index = hnswlib.Index(space="cosine", dim=model.get_sentence_embedding_dimension())
+        entries: List[Entry] = []
+
+        index_file, meta_file = self._paths()
+        if index_file and os.path.exists(index_file) and os.path.exists(meta_file):
+            try:
+                index.load_index(index_file, max_elements=self.config.max_elements)
+                with open(meta_file, "rb") as f:
+                    entries = [tuple(entry) for entry in orjson.loads(f.read())]
+                # 两个文件不是同一次保存的结果时，HNSW标签无法对应到答案
+                if index.get_current_count() != len(entries):
+                    raise ValueError(
+                        f"索引条目数 {index.get_current_count()} 与元数据条目数 {len(entries)} 不一致"
+                    )
+            except Exception as e:
+                logger.warning("加载语义缓存索引失败，将重新建立: %s", e)
+                index = hnswlib.Index(space="cosine", dim=model.get_sentence_embedding_dimension())
+                entries = []
+
+        if not entries:
+            index.init_index(max_elements=self.config.max_elements, ef_construction=200, M=16)
+        index.set_ef(self.config.ef)
+
+        for key, _, question_type, answer in entries:
+            self._exact[key] = (question_type, answer)
+        self._model = model
+        self._index = index
+        self._entries = entries
+        logger.info("语义缓存已加载，共 %d 条答案", len(entries))
+
+    def save(self):
+        """保存索引（应用关闭时在工作线程中调用；两个文件都先写临时文件再替换，不会留下写了一半的文件）"""
+        index_file, meta_file = self._paths()
+        if not self.enabled or not index_file:
+            return
+
+        os.makedirs(self.config.index_path, exist_ok=True)
+        suffix = f".{os.getpid()}.tmp"
+        self._index.save_index(index_file + suffix)
+        with open(meta_file + suffix, "wb") as f:
+            f.write(orjson.dumps(self._entries))
+        os.replace(index_file + suffix, index_file)
+        os.replace(meta_file + suffix, meta_file)
+        logger.info("语义缓存索引已保存，共 %d 条答案", len(self._entries))
+
+    async def lookup(self, provider: str, model: str, question: str, options: str = "",
+                     question_type: str = "") -> Tuple[Optional[str], Any]:
+        """
+        查找相同或足够相似的问题的答案（选项不同的题目不共用答案）
+
+        Args:
+            provider: 提供商名称
+            model: 模型名称
+            question: 问题内容
+            options: 选项内容
+            question_type: 问题类型
+
+        Returns:
+            Tuple: (缓存的答案或None, 问题的句向量)；未命中时把句向量传给 add() 以免重复计算
+        """
+        scope = self._scope(provider, model, options)
+        cached = self._exact.get(self._exact_key(scope, question))
+        if cached is not None and cached[0] == question_type:
+            return cached[1], None
+
+        vector = await anyio.to_thread.run_sync(self._encode, question)
+        return self._search(scope, question_type, vector), vector
+
+    def add(self, provider: str, model: str, question: str, options: str, question_type: str,
+            answer: str, vector: Any = None):
+        """
+        缓存AI答案
+
+        Args:
+            provider: 提供商名称
+            model: 模型名称
+            question: 问题内容
+            options: 选项内容
+            question_type: 问题类型
+            answer: 答案
+            vector: lookup() 返回的句向量，为None时只写入精确缓存
+        """
+        scope = self._scope(provider, model, options)
+        key = self._exact_key(scope, question)
+        self._exact[key] = (question_type, answer)
+
+        if vector is None:
+            return
+        if len(self._entries) >= self.config.max_elements:
+            logger.debug("语义缓存索引已满，不再加入新问题")
+            return
+
+        self._index.add_items(vector, [len(self._entries)], num_threads=1)
+        self._entries.append((key, scope, question_type, answer))
+
+    def _search(self, scope: str, question_type: str, vector: Any) -> Optional[str]:
+        """在HNSW索引中查找相似度达到阈值且提供商、选项、题型都相同的答案"""
+        count = len(self._entries)
+        if count == 0:
+            return None
+
+        labels, distances = self._index.knn_query(vector, k=min(_CANDIDATES, count), num_threads=1)
+        for label, distance in zip(labels[0], distances[0]):
+            # cosine空间的距离为 1 - 余弦相似度，结果按距离从小到大排列
+            if 1.0 - distance < self.config.threshold:
+                break
+            _, entry_scope, entry_type, answer = self._entries[label]
+            if entry_scope == scope and entry_type == question_type:
+                return answer
+        return None
+
+    def _encode(self, question: str) -> Any:
+        """计算归一化的句向量"""
+        return self._model.encode([question.strip()], normalize_embeddings=True)
+
+    def _paths(self) -> Tuple[Optional[str], Optional[str]]:
+        """索引文件和元数据文件路径（未配置持久化目录时为None）"""
+        if not self.config.index_path:
+            return None, None
+        return (
+            os.path.join(self.config.index_path, _INDEX_FILE),
+            os.path.join(self.config.index_path, _META_FILE)
+        )
+
+    @staticmethod
+    def _scope(provider: str, model: str, options: str) -> str:
+        """答案的适用范围：提供商|模型|规范化选项"""
+        return f"{provider}|{model}|{normalize_question(options)}"
+
+    @staticmethod
+    def _exact_key(scope: str, question: str) -> str:
+        """精确查找键：sha256(提供商|模型|规范化选项|规范化问题)"""
+        return hashlib.sha256(f"{scope}|{normalize_question(question)}".encode()).hexdigest()
+
+
+# 全局语义缓存
+semantic_cache = SemanticCache(get_settings().semantic_cache)
@@ -0,0 +1,22 @@
+"""
+提供商请求编码与流式事件解析使用的JSON函数（完整响应体按结构解码，见 _responses）
+优先使用orjson（直接读写UTF-8字节，无需经过str），未安装时回退到标准库json
+"""
+
+try:
+    import orjson
+
+    loads = orjson.loads
+    dumps = orjson.dumps
+    JSONDecodeError = orjson.JSONDecodeError
+except ImportError:  # pragma: no cover - orjson 是默认依赖
+    import json
+
+    loads = json.loads
+    JSONDecodeError = json.JSONDecodeError
+
+    def dumps(obj) -> bytes:
+        """编码为紧凑的UTF-8 JSON字节（与orjson.dumps输出一致）"""
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+__all__ = ["loads", "dumps", "JSONDecodeError"]
@@ -0,0 +1,93 @@
+"""
+提供商响应结构定义
+响应体直接按声明的结构解码（msgspec），只构建用到的字段，忽略其余元数据，
+不再先生成完整的字典再逐层查找
+"""
+
+from typing import List, Optional
+
+import msgspec
+
+# 响应体不是合法JSON时抛出的异常
+DecodeError = msgspec.DecodeError
+
+
+class _Message(msgspec.Struct):
+    content: str
+
+
+class _Choice(msgspec.Struct):
+    message: _Message
+
+
+class _ChatCompletion(msgspec.Struct):
+    """OpenAI兼容格式（阿里百炼、DeepSeek、OpenAI）: choices[0].message.content"""
+    choices: List[_Choice] = []
+
+
+class _GeminiPart(msgspec.Struct):
+    text: str
+
+
+class _GeminiContent(msgspec.Struct):
+    parts: List[_GeminiPart] = []
+
+
+class _GeminiCandidate(msgspec.Struct):
+    content: Optional[_GeminiContent] = None
+
+
+class _GeminiResponse(msgspec.Struct):
+    """Gemini格式: candidates[0].content.parts[0].text"""
+    candidates: List[_GeminiCandidate] = []
+
+
+_CHAT_COMPLETION_DECODER = msgspec.json.Decoder(_ChatCompletion)
+_GEMINI_DECODER = msgspec.json.Decoder(_GeminiResponse)
+
+
+def chat_completion_content(response_body: bytes) -> Optional[str]:
+    """
+    取出OpenAI兼容响应中的回答内容
+
+    Args:
+        response_body: 原始响应体
+
+    Returns:
+        Optional[str]: 回答内容，响应格式不符时返回None
+
+    Raises:
+        DecodeError: 响应体不是合法JSON
+    """
+    try:
+        result = _CHAT_COMPLETION_DECODER.decode(response_body)
+    except msgspec.ValidationError:
+        return None
+    if not result.choices:
+        return None
+    return result.choices[0].message.content
+
+
+def gemini_text(response_body: bytes) -> Optional[str]:
+    """
+    取出Gemini响应中的回答内容
+
+    Args:
+        response_body: 原始响应体
+
+    Returns:
+        Optional[str]: 回答内容，响应格式不符（如被安全策略拦截没有content）时返回None
+
+    Raises:
+        DecodeError: 响应体不是合法JSON
+    """
+    try:
+        result = _GEMINI_DECODER.decode(response_body)
+    except msgspec.ValidationError:
+        return None
+    if not result.candidates:
+        return None
+    content = result.candidates[0].content
+    if content is None or not content.parts:
+        return None
+    return content.parts[0].text
@@ -3,15 +3,44 @@
 支持阿里云百炼平台的AI模型调用
 """
 
-import json
-from typing import Dict, Any
+import logging
+from functools import cached_property
+from types import MappingProxyType
+from typing import Any, Dict, Mapping
+
+from . import _responses
 from .base import AIProviderBase
 
+logger = logging.getLogger(__name__)
+
+# 提示词固定前缀（后面紧跟紧凑JSON格式的问题）
+_PROMPT_HEAD = '你是一个题库接口函数，请根据问题和选项提供答案。如果是选择题，直接返回对应选项的内容，注意是内容，不是对应字母；如果题目是多选题，将内容用"###"连接；如果选项内容是"对","错"，且只有两项，或者question_type是judgement，你直接返回"对"或"错"的文字，不要返回字母；如果是填空题，直接返回填空内容，多个空使用###连接。回答格式为：{"anwser":"your_anwser_str"}，严格使用此格式回答。比如我问你一个问题，你回答的是"是"，你回答的格式为：{"anwser":"是"}。不要回答嗯，好的，我知道了之类的话，你的回答只能是json。下面是一个问题，请你用json格式回答我，绝对不要使用自然语言'
+
 
 class AlibabaProvider(AIProviderBase):
     """阿里百炼AI服务提供商"""
 
-    def query(self, question: str, options: str = "", question_type: str = "") -> str:
+    def __init__(self, config: Dict[str, Any]):
+        """
+        初始化阿里百炼提供商，预先构建请求数据中不随问题变化的部分
+
+        Args:
+            config: 提供商配置字典
+        """
+        super().__init__(config)
+        self._request_template = {
+            "model": self.model,
+            "stream": self.stream,
+            "max_tokens": self.max_tokens,
+            "stop": None,
+            "temperature": self.temperature,
+            "top_p": self.top_p,
+            "frequency_penalty": 0.5,
+            "n": 1,
+            "response_format": {"type": "text"}
+        }
+
+    async def query(self, question: str, options: str = "", question_type: str = "") -> str:
         """
         查询阿里百炼AI模型获取答案
 
@@ -27,28 +56,43 @@ class AlibabaProvider(AIProviderBase):
             # 构建提示词
             prompt = self._build_prompt(question, options, question_type)
 
-            # 准备请求数据
-            request_data = self._prepare_request_data(prompt)
-
-            # 准备请求头
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json"
-            }
-
-            # 发送请求
-            response_text = self._make_request(self.base_url + "/chat/completions", headers, request_data)
-
-            # 解析响应
-            answer = self._parse_response(response_text)
+            # 发送请求并解析响应
+            answer = await self._complete(prompt)
 
             # 提取JSON格式的答案
             return self._extract_answer_from_json(answer)
 
         except Exception as e:
-            print(f"[阿里百炼] 查询失败: {str(e)}")
+            logger.warning("查询失败: %s", e)
             return f"阿里百炼API调用失败: {str(e)}"
 
+    async def _complete(self, prompt: str, batch: bool = False) -> str:
+        """
+        发送提示词到阿里百炼并返回模型的回答内容
+
+        Args:
+            prompt: 提示词
+            batch: 是否为批量提问
+
+        Returns:
+            str: 模型回答的原始内容
+
+        Raises:
+            Exception: 请求失败时抛出异常
+        """
+        # 准备请求数据
+        request_data = self._prepare_request_data(prompt)
+
+        # 准备请求头（Content-Type 由基类统一设置）
+        headers = {
+            "Authorization": f"Bearer {self.api_key}"
+        }
+
+        # 发送请求并解析响应（流式请求收到完整答案后即结束；批量回答需读完整个数组）
+        return await self._request_answer(
+            self.base_url + "/chat/completions", headers, request_data, stop_early=not batch
+        )
+
     def _build_prompt(self, question: str, options: str, question_type: str) -> str:
         """
         构建阿里百炼提示词
@@ -61,15 +105,13 @@ class AlibabaProvider(AIProviderBase):
         Returns:
             str: 构建的提示词
         """
-        content = '''你是一个题库接口函数，请根据问题和选项提供答案。如果是选择题，直接返回对应选项的内容，注意是内容，不是对应字母；如果题目是多选题，将内容用"###"连接；如果选项内容是"对","错"，且只有两项，或者question_type是judgement，你直接返回"对"或"错"的文字，不要返回字母；如果是填空题，直接返回填空内容，多个空使用###连接。回答格式为：{"anwser":"your_anwser_str"}，严格使用此格式回答。比如我问你一个问题，你回答的是"是"，你回答的格式为：{"anwser":"是"}。不要回答嗯，好的，我知道了之类的话，你的回答只能是json。下面是一个问题，请你用json格式回答我，绝对不要使用自然语言'''
-
-        content += f'''{{
-            "问题": "{question}",
-            "选项": "{options}",
-            "类型": "{question_type}"
-        }}'''
-
-        return content
+        return "".join((
+            _PROMPT_HEAD,
+            '{"问题":"', question,
+            '","选项":"', options,
+            '","类型":"', question_type,
+            '"}'
+        ))
 
     def _prepare_request_data(self, prompt: str) -> Dict[str, Any]:
         """
@@ -81,69 +123,56 @@ class AlibabaProvider(AIProviderBase):
         Returns:
             Dict: 请求数据
         """
-        return {
-            "model": self.model,
-            "messages": [
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
-            "stream": False,
-            "max_tokens": self.max_tokens,
-            "stop": None,
-            "temperature": self.temperature,
-            "top_p": self.top_p,
-            "frequency_penalty": 0.5,
-            "n": 1,
-            "response_format": {"type": "text"}
-        }
+        # 浅拷贝模板，只替换消息列表（并发请求之间不共享可变数据）
+        return {**self._request_template, "messages": [{"role": "user", "content": prompt}]}
 
-    def _parse_response(self, response_text: str) -> str:
+    def _parse_response(self, response_body: bytes) -> str:
         """
         解析阿里百炼响应内容
 
         Args:
-            response_text: 原始响应文本
+            response_body: 原始响应体
 
         Returns:
             str: 解析后的答案
         """
         try:
-            # 解析JSON响应
-            result = json.loads(response_text)
-
-            if "choices" in result and len(result["choices"]) > 0:
-                answer = result["choices"][0]["message"]["content"]
-                print(f"[阿里百炼] AI返回答案: {answer[:100]}...")
-                return answer
-            else:
-                print(f"[阿里百炼] API响应格式异常: {response_text}")
-                return "无法从API获取答案"
-
-        except json.JSONDecodeError as e:
-            print(f"[阿里百炼] JSON解析错误: {str(e)}")
-            print(f"[阿里百炼] 响应内容: {response_text}")
+            # 按响应结构直接解码
+            answer = _responses.chat_completion_content(response_body)
+        except _responses.DecodeError as e:
+            self._log_bad_response(f"JSON解析错误: {e}", response_body)
             return f"API响应解析失败: {str(e)}"
 
-    def get_model_info(self) -> Dict[str, Any]:
-        """
-        获取模型信息
+        if answer is None:
+            self._log_bad_response("API响应格式异常", response_body)
+            return "无法从API获取答案"
 
-        Returns:
-            Dict: 模型信息
-        """
-        return {
+        logger.debug("AI返回答案: %.100s...", answer)
+        return answer
+
+    @cached_property
+    def _model_info(self) -> Mapping[str, Any]:
+        """模型信息（首次访问时构建，之后每次返回同一个只读映射）"""
+        return MappingProxyType({
             "provider": "阿里百炼",
             "model": self.model,
             "base_url": self.base_url,
             "max_tokens": self.max_tokens,
             "temperature": self.temperature,
             "top_p": self.top_p,
-            "supported_features": [
+            "supported_features": (
                 "chat_completion",
                 "json_response",
                 "temperature_control",
                 "token_limit"
-            ]
-        }
\ No newline at end of file
+            )
+        })
+
+    def get_model_info(self) -> Mapping[str, Any]:
+        """
+        获取模型信息
+
+        Returns:
+            Mapping: 模型信息（只读）
+        """
+        return self._model_info
@@ -4,10 +4,42 @@ AI服务提供商基础接口
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
-import requests
+from typing import Awaitable, Callable, Dict, Any, List, Optional, Sequence, Tuple, TypeVar
+import asyncio
+import logging
 import time
-import traceback
+import httpx
+
+from . import _json
+from .http import get_client
+from ..answer_text import extract_answer_from_json, is_answer_complete, parse_batch_answers
+
+logger = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+# 建立连接的超时时间（秒）
+_CONNECT_TIMEOUT = 5
+
+# 请求体由 _json.dumps 编码为紧凑的UTF-8 JSON（中文不转义为\uXXXX），并在请求头中声明编码
+_CONTENT_TYPE = "application/json; charset=utf-8"
+
+# 响应解析失败的日志：每个提供商每秒最多记录一条，响应内容只记录前512字节
+_BAD_RESPONSE_LOG_INTERVAL = 1.0
+_BAD_RESPONSE_LOG_BYTES = 512
+
+# 批量提问的提示词固定前缀（后面依次是编号的题目）
+_BATCH_PROMPT_HEAD = '''你是一个专业的题库回答助手。下面有多道编号的题目，请按编号顺序逐一给出准确答案。
+
+答题规则：
+1. 选择题：直接返回选项内容，不是字母
+2. 多选题：多个答案用"###"连接
+3. 判断题：直接返回"对"或"错"
+4. 填空题：直接填写内容，多个空用"###"连接
+
+回答格式必须是严格的JSON字符串数组，按题目顺序每道题一个元素：["第1题答案","第2题答案"]
+
+'''
 
 
 class AIProviderBase(ABC):
@@ -29,11 +61,17 @@ class AIProviderBase(ABC):
         self.temperature = config.get('temperature', 0.1)
         self.top_p = config.get('top_p', 0.9)
         self.timeout = config.get('timeout', 30)
+        # 连接阶段单独使用较短的超时，读取响应仍使用完整超时
+        self._timeout = httpx.Timeout(self.timeout, connect=min(_CONNECT_TIMEOUT, self.timeout))
         self.max_retries = config.get('max_retries', 3)
         self.retry_delay = config.get('retry_delay', 2)
+        self.stream = config.get('stream', False)
+        self.ca_bundle = config.get('ca_bundle') or None
+        self._bad_response_logged_at = float("-inf")
+        self._bad_response_suppressed = 0
 
     @abstractmethod
-    def query(self, question: str, options: str = "", question_type: str = "") -> str:
+    async def query(self, question: str, options: str = "", question_type: str = "") -> str:
         """
         查询AI模型获取答案
 
@@ -47,6 +85,46 @@ class AIProviderBase(ABC):
         """
         pass
 
+    async def query_batch(self, items: Sequence[Tuple[str, str, str]]) -> List[str]:
+        """
+        在一次请求中回答多道题目
+
+        Args:
+            items: (问题, 选项, 问题类型) 列表
+
+        Returns:
+            List[str]: 与题目一一对应的答案
+
+        Raises:
+            Exception: 请求失败、提供商不支持或回答格式不符时抛出异常
+        """
+        parts = [_BATCH_PROMPT_HEAD]
+        for number, (question, options, question_type) in enumerate(items, 1):
+            parts.append(f"{number}. 问题：{question}\n选项：{options}\n类型：{question_type}\n")
+
+        content = await self._complete("".join(parts), batch=True)
+        answers = parse_batch_answers(content, len(items))
+        if answers is None:
+            raise ValueError(f"批量回答格式异常: {content[:200]}")
+        return answers
+
+    @abstractmethod
+    async def _complete(self, prompt: str, batch: bool = False) -> str:
+        """
+        发送提示词并返回模型的回答内容
+
+        Args:
+            prompt: 提示词
+            batch: 是否为批量提问（回答是JSON数组，流式响应需读到结束，不能收到第一个答案就停止）
+
+        Returns:
+            str: 模型回答的原始内容
+
+        Raises:
+            Exception: 请求失败时抛出异常
+        """
+        pass
+
     @abstractmethod
     def _build_prompt(self, question: str, options: str, question_type: str) -> str:
         """
@@ -75,9 +153,37 @@ class AIProviderBase(ABC):
         """
         pass
 
-    def _make_request(self, url: str, headers: Dict[str, str], data: Dict[str, Any]) -> str:
+    async def _request_answer(
+        self, url: str, headers: Dict[str, str], data: Dict[str, Any], stop_early: bool = True
+    ) -> str:
+        """
+        发送请求并返回模型的回答内容（开启流式响应时边接收边检查，收到完整答案后即结束）
+
+        Args:
+            url: 请求URL
+            headers: 请求头
+            data: 请求数据（"stream" 字段需与 self.stream 一致）
+            stop_early: 流式响应收到完整的答案JSON后是否立即结束读取
+
+        Returns:
+            str: 模型回答的原始内容
+
+        Raises:
+            Exception: 请求失败时抛出异常
+        """
+        if not self.stream:
+            return self._parse_response(await self._make_request(url, headers, data))
+
+        answer = await self._make_stream_request(url, headers, data, stop_early)
+        if not answer:
+            logger.warning("[%s] 流式响应中没有回答内容", self.name)
+            return "无法从API获取答案"
+        logger.debug("[%s] AI返回答案: %.100s...", self.name, answer)
+        return answer
+
+    async def _make_request(self, url: str, headers: Dict[str, str], data: Dict[str, Any]) -> bytes:
         """
-        发送HTTP请求（带重试机制）
+        发送HTTP请求（带重试机制，使用共享的异步连接池）
 
         Args:
             url: 请求URL
@@ -85,73 +191,208 @@ class AIProviderBase(ABC):
             data: 请求数据
 
         Returns:
-            str: 响应内容
+            bytes: 响应体原始字节（直接交给JSON解析，省去解码）
 
         Raises:
             Exception: 请求失败时抛出异常
         """
-        for attempt in range(self.max_retries):
-            try:
-                print(f"[{self.name}] 尝试 {attempt + 1}/{self.max_retries}")
-                print(f"[{self.name}] 请求URL: {url}")
+        # 请求体只编码一次，重试时直接复用
+        body = _json.dumps(data)
+        headers = {"Content-Type": _CONTENT_TYPE, **headers}
+
+        async def send(last_attempt: bool) -> Optional[bytes]:
+            response = await get_client(self.ca_bundle).post(
+                url,
+                content=body,
+                headers=headers,
+                timeout=self._timeout
+            )
 
-                response = requests.post(
-                    url,
-                    json=data,
-                    headers=headers,
-                    timeout=self.timeout,
-                    verify=False
-                )
+            logger.debug("[%s] 响应状态码: %d", self.name, response.status_code)
 
-                print(f"[{self.name}] 响应状态码: {response.status_code}")
+            # 如果是服务器错误，尝试重试
+            if response.status_code >= 500 and not last_attempt:
+                return None
+
+            response.raise_for_status()
+            return response.content
+
+        return await self._send_with_retries(url, send)
+
+    async def _make_stream_request(
+        self, url: str, headers: Dict[str, str], data: Dict[str, Any], stop_early: bool = True
+    ) -> str:
+        """
+        发送流式HTTP请求（SSE），累积回答内容，收到完整的答案JSON后立即结束读取
+
+        Args:
+            url: 请求URL
+            headers: 请求头
+            data: 请求数据（需包含 "stream": True）
+            stop_early: 收到完整的答案JSON后是否立即结束读取
+
+        Returns:
+            str: 累积的回答内容
+
+        Raises:
+            Exception: 请求失败时抛出异常
+        """
+        # 请求体只编码一次，重试时直接复用
+        body = _json.dumps(data)
+        headers = {"Content-Type": _CONTENT_TYPE, **headers}
+
+        async def send(last_attempt: bool) -> Optional[str]:
+            async with get_client(self.ca_bundle).stream(
+                "POST",
+                url,
+                content=body,
+                headers=headers,
+                timeout=self._timeout
+            ) as response:
+                logger.debug("[%s] 响应状态码: %d", self.name, response.status_code)
 
                 # 如果是服务器错误，尝试重试
-                if response.status_code >= 500:
-                    if attempt < self.max_retries - 1:
-                        print(f"[{self.name}] 服务器错误，将在 {self.retry_delay} 秒后重试...")
-                        time.sleep(self.retry_delay)
-                        continue
+                if response.status_code >= 500 and not last_attempt:
+                    return None
 
                 response.raise_for_status()
-                return response.text
+                return await self._read_event_stream(response, stop_early)
+
+        return await self._send_with_retries(url, send)
+
+    async def _read_event_stream(self, response: httpx.Response, stop_early: bool = True) -> str:
+        """
+        读取SSE事件流中的回答内容
+
+        Args:
+            response: 流式响应
+            stop_early: 收到完整的答案JSON后是否立即结束读取（否则读到 [DONE] 或流结束为止）
+
+        Returns:
+            str: 累积的回答内容
+        """
+        parts = []
+        async for line in response.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            payload = line[5:].strip()
+            if payload == "[DONE]":
+                break
+
+            delta = self._stream_delta(_json.loads(payload))
+            if not delta:
+                continue
+            parts.append(delta)
+
+            # 答案JSON已完整，不再等待剩余的事件（退出时关闭响应）
+            if stop_early and "}" in delta and is_answer_complete("".join(parts)):
+                logger.debug("[%s] 已收到完整答案，提前结束流式读取", self.name)
+                break
+
+        return "".join(parts)
+
+    def _stream_delta(self, event: Dict[str, Any]) -> str:
+        """
+        从单个流式事件中取出新增的回答内容（默认为OpenAI兼容格式）
+
+        Args:
+            event: 解码后的事件数据
+
+        Returns:
+            str: 新增内容，没有时返回空字符串
+        """
+        choices = event.get("choices")
+        if not choices:
+            return ""
+        return choices[0].get("delta", {}).get("content") or ""
+
+    async def _send_with_retries(self, url: str, send: Callable[[bool], Awaitable[Optional[_T]]]) -> _T:
+        """
+        按配置的次数重试发送请求
+
+        Args:
+            url: 请求URL（用于日志）
+            send: 发送一次请求的协程函数，参数表示是否为最后一次尝试；
+                返回None表示服务器错误，需要重试
+
+        Returns:
+            send 返回的响应内容
+
+        Raises:
+            Exception: 请求失败时抛出异常
+        """
+        for attempt in range(self.max_retries):
+            try:
+                logger.debug("[%s] 尝试 %d/%d", self.name, attempt + 1, self.max_retries)
+                logger.debug("[%s] 请求URL: %s", self.name, url)
+
+                result = await send(attempt == self.max_retries - 1)
+                if result is not None:
+                    return result
+
+                logger.warning("[%s] 服务器错误，将在 %s 秒后重试...", self.name, self.retry_delay)
+                await asyncio.sleep(self.retry_delay)
 
-            except requests.exceptions.Timeout:
-                print(f"[{self.name}] 请求超时")
+            except httpx.TimeoutException:
+                logger.warning("[%s] 请求超时", self.name)
                 if attempt < self.max_retries - 1:
-                    print(f"[{self.name}] 将在 {self.retry_delay} 秒后重试...")
-                    time.sleep(self.retry_delay)
+                    logger.info("[%s] 将在 %s 秒后重试...", self.name, self.retry_delay)
+                    await asyncio.sleep(self.retry_delay)
                 else:
                     raise Exception("API调用超时，请稍后再试")
 
-            except requests.exceptions.RequestException as e:
-                print(f"[{self.name}] 请求异常: {str(e)}")
+            except httpx.HTTPError as e:
+                logger.warning("[%s] 请求异常: %s", self.name, e)
                 if attempt < self.max_retries - 1:
-                    print(f"[{self.name}] 将在 {self.retry_delay} 秒后重试...")
-                    time.sleep(self.retry_delay)
+                    logger.info("[%s] 将在 %s 秒后重试...", self.name, self.retry_delay)
+                    await asyncio.sleep(self.retry_delay)
                 else:
                     raise Exception(f"API请求异常: {str(e)}")
 
             except Exception as e:
-                error_trace = traceback.format_exc()
-                print(f"[{self.name}] 调用失败: {str(e)}")
-                print(f"[{self.name}] 详细错误信息: {error_trace}")
+                logger.exception("[%s] 调用失败: %s", self.name, e)
                 raise Exception(f"API调用失败: {str(e)}")
 
         raise Exception("多次尝试后仍无法获取答案，请稍后再试")
 
     @abstractmethod
-    def _parse_response(self, response_text: str) -> str:
+    def _parse_response(self, response_body: bytes) -> str:
         """
         解析响应内容
 
         Args:
-            response_text: 原始响应文本
+            response_body: 原始响应体
 
         Returns:
             str: 解析后的答案
         """
         pass
 
+    def _log_bad_response(self, message: str, response_body: bytes):
+        """
+        记录无法解析的响应（限制频率并截断内容，错误集中出现时不会刷屏）
+
+        Args:
+            message: 错误说明
+            response_body: 原始响应体
+        """
+        now = time.monotonic()
+        if now - self._bad_response_logged_at < _BAD_RESPONSE_LOG_INTERVAL:
+            self._bad_response_suppressed += 1
+            return
+
+        suppressed = self._bad_response_suppressed
+        self._bad_response_logged_at = now
+        self._bad_response_suppressed = 0
+        logger.warning(
+            "[%s] %s，响应前%d字节: %s%s",
+            self.name,
+            message,
+            _BAD_RESPONSE_LOG_BYTES,
+            response_body[:_BAD_RESPONSE_LOG_BYTES].decode("utf-8", "replace"),
+            f"（此前1秒内另有 {suppressed} 条未记录）" if suppressed else ""
+        )
+
     def _extract_answer_from_json(self, ai_answer: str) -> str:
         """
         从AI返回的答案中提取JSON格式的答案
@@ -162,58 +403,7 @@ class AIProviderBase(ABC):
         Returns:
             str: 提取的答案内容
         """
-        import json
-        import re
-
-        try:
-            # 尝试解析JSON格式的答案
-            if "{" in ai_answer and "}" in ai_answer:
-                # 提取JSON部分 - 从第一个{到最后一个}
-                start_idx = ai_answer.find("{")
-                end_idx = ai_answer.rfind("}") + 1
-                json_str = ai_answer[start_idx:end_idx]
-
-                # 处理可能的格式问题
-                # 1. 替换单引号为双引号
-                json_str = json_str.replace("'", '"')
-
-                # 2. 处理没有引号的键名 {answer: -> {"answer":
-                json_str = re.sub(r'{(\s*)(\w+)(\s*):', r'{\1"\2"\3:', json_str)
-                json_str = re.sub(r',(\s*)(\w+)(\s*):', r',\1"\2"\3:', json_str)
-
-                # 3. 移除所有换行符和多余空格，使JSON更紧凑
-                json_str = re.sub(r'\s+', ' ', json_str).strip()
-
-                print(f"[{self.name}] 处理后的JSON字符串: {json_str}")
-
-                # 尝试解析JSON
-                answer_dict = json.loads(json_str)
-
-                # 提取answer字段
-                if "answer" in answer_dict:
-                    return answer_dict["answer"]
-                elif "anwser" in answer_dict:  # 处理可能的拼写错误
-                    return answer_dict["anwser"]
-
-        except json.JSONDecodeError as e:
-            print(f"[{self.name}] 解析AI回答JSON失败: {str(e)}")
-
-            # 尝试直接提取引号中的内容作为答案
-            if '"answer"' in ai_answer or '"anwser"' in ai_answer:
-                try:
-                    # 使用正则表达式提取引号中的内容
-                    answer_match = re.search(r'"answer"\s*:\s*"([^"]+)"', ai_answer)
-                    if answer_match:
-                        return answer_match.group(1)
-                    else:
-                        answer_match = re.search(r'"anwser"\s*:\s*"([^"]+)"', ai_answer)
-                        if answer_match:
-                            return answer_match.group(1)
-                except Exception as regex_error:
-                    print(f"[{self.name}] 正则提取答案失败: {str(regex_error)}")
-
-        # 如果JSON解析失败，返回原始答案
-        return ai_answer
+        return extract_answer_from_json(ai_answer, self.name)
 
     def is_enabled(self) -> bool:
         """检查提供商是否启用"""
@@ -3,15 +3,70 @@ DeepSeek AI服务适配器
 支持DeepSeek平台的AI模型调用
 """
 
-import json
-from typing import Dict, Any
+import logging
+from functools import cached_property
+from types import MappingProxyType
+from typing import Any, Dict, Mapping
+
+from . import _responses
 from .base import AIProviderBase
 
+logger = logging.getLogger(__name__)
+
+
+# 提示词固定前缀（到问题字段为止，后面依次拼接问题、选项和类型）
+_PROMPT_HEAD = '''你是一个专业的题库回答助手。请根据提供的问题和选项给出准确答案。
+
+答题规则：
+1. 选择题：直接返回选项内容，不是字母
+2. 多选题：多个答案用"###"连接
+3. 判断题：直接返回"对"或"错"
+4. 填空题：直接填写内容，多个空用"###"连接
+
+回答格式必须是严格的JSON格式：{"answer":"你的答案"}
+
+请回答以下问题：
+
+问题：'''
+
+
+# 系统消息（所有单题请求共用）
+_SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": "你是一个专业的题库回答助手，总是以JSON格式返回答案。"
+}
+
+
+# 批量提问的系统消息（回答是与题目一一对应的JSON数组）
+_BATCH_SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": "你是一个专业的题库回答助手，总是以JSON字符串数组格式按题目顺序返回答案。"
+}
+
 
 class DeepSeekProvider(AIProviderBase):
     """DeepSeek AI服务提供商"""
 
-    def query(self, question: str, options: str = "", question_type: str = "") -> str:
+    def __init__(self, config: Dict[str, Any]):
+        """
+        初始化DeepSeek提供商，预先构建请求数据中不随问题变化的部分
+
+        Args:
+            config: 提供商配置字典
+        """
+        super().__init__(config)
+        self._request_template = {
+            "model": self.model,
+            "stream": self.stream,
+            "max_tokens": self.max_tokens,
+            "temperature": self.temperature,
+            "top_p": self.top_p,
+            "frequency_penalty": 0.1,
+            "presence_penalty": 0.1,
+            "stop": None
+        }
+
+    async def query(self, question: str, options: str = "", question_type: str = "") -> str:
         """
         查询DeepSeek AI模型获取答案
 
@@ -27,28 +82,43 @@ class DeepSeekProvider(AIProviderBase):
             # 构建提示词
             prompt = self._build_prompt(question, options, question_type)
 
-            # 准备请求数据
-            request_data = self._prepare_request_data(prompt)
-
-            # 准备请求头
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json"
-            }
-
-            # 发送请求
-            response_text = self._make_request(self.base_url + "/chat/completions", headers, request_data)
-
-            # 解析响应
-            answer = self._parse_response(response_text)
+            # 发送请求并解析响应
+            answer = await self._complete(prompt)
 
             # 提取JSON格式的答案
             return self._extract_answer_from_json(answer)
 
         except Exception as e:
-            print(f"[DeepSeek] 查询失败: {str(e)}")
+            logger.warning("查询失败: %s", e)
             return f"DeepSeek API调用失败: {str(e)}"
 
+    async def _complete(self, prompt: str, batch: bool = False) -> str:
+        """
+        发送提示词到DeepSeek并返回模型的回答内容
+
+        Args:
+            prompt: 提示词
+            batch: 是否为批量提问
+
+        Returns:
+            str: 模型回答的原始内容
+
+        Raises:
+            Exception: 请求失败时抛出异常
+        """
+        # 准备请求数据
+        request_data = self._prepare_request_data(prompt, batch)
+
+        # 准备请求头（Content-Type 由基类统一设置）
+        headers = {
+            "Authorization": f"Bearer {self.api_key}"
+        }
+
+        # 发送请求并解析响应（流式请求收到完整答案后即结束；批量回答需读完整个数组）
+        return await self._request_answer(
+            self.base_url + "/chat/completions", headers, request_data, stop_early=not batch
+        )
+
     def _build_prompt(self, question: str, options: str, question_type: str) -> str:
         """
         构建DeepSeek提示词
@@ -61,97 +131,75 @@ class DeepSeekProvider(AIProviderBase):
         Returns:
             str: 构建的提示词
         """
-        content = '''你是一个专业的题库回答助手。请根据提供的问题和选项给出准确答案。
+        return "".join((
+            _PROMPT_HEAD, question,
+            "\n选项：", options,
+            "\n类型：", question_type
+        ))
 
-答题规则：
-1. 选择题：直接返回选项内容，不是字母
-2. 多选题：多个答案用"###"连接
-3. 判断题：直接返回"对"或"错"
-4. 填空题：直接填写内容，多个空用"###"连接
-
-回答格式必须是严格的JSON格式：{"answer":"你的答案"}
-
-请回答以下问题：'''
-
-        return f"{content}\n\n问题：{question}\n选项：{options}\n类型：{question_type}"
-
-    def _prepare_request_data(self, prompt: str) -> Dict[str, Any]:
+    def _prepare_request_data(self, prompt: str, batch: bool = False) -> Dict[str, Any]:
         """
         准备DeepSeek请求数据
 
         Args:
             prompt: 提示词
+            batch: 是否为批量提问（使用要求返回JSON数组的系统消息）
 
         Returns:
             Dict: 请求数据
         """
-        return {
-            "model": self.model,
-            "messages": [
-                {
-                    "role": "system",
-                    "content": "你是一个专业的题库回答助手，总是以JSON格式返回答案。"
-                },
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
-            "stream": False,
-            "max_tokens": self.max_tokens,
-            "temperature": self.temperature,
-            "top_p": self.top_p,
-            "frequency_penalty": 0.1,
-            "presence_penalty": 0.1,
-            "stop": None
-        }
+        system_message = _BATCH_SYSTEM_MESSAGE if batch else _SYSTEM_MESSAGE
+        # 浅拷贝模板，只替换消息列表（并发请求之间不共享可变数据）
+        return {**self._request_template, "messages": [system_message, {"role": "user", "content": prompt}]}
 
-    def _parse_response(self, response_text: str) -> str:
+    def _parse_response(self, response_body: bytes) -> str:
         """
         解析DeepSeek响应内容
 
         Args:
-            response_text: 原始响应文本
+            response_body: 原始响应体
 
         Returns:
             str: 解析后的答案
         """
         try:
-            # 解析JSON响应
-            result = json.loads(response_text)
-
-            if "choices" in result and len(result["choices"]) > 0:
-                answer = result["choices"][0]["message"]["content"]
-                print(f"[DeepSeek] AI返回答案: {answer[:100]}...")
-                return answer
-            else:
-                print(f"[DeepSeek] API响应格式异常: {response_text}")
-                return "无法从API获取答案"
-
-        except json.JSONDecodeError as e:
-            print(f"[DeepSeek] JSON解析错误: {str(e)}")
-            print(f"[DeepSeek] 响应内容: {response_text}")
+            # 按响应结构直接解码
+            answer = _responses.chat_completion_content(response_body)
+        except _responses.DecodeError as e:
+            self._log_bad_response(f"JSON解析错误: {e}", response_body)
             return f"API响应解析失败: {str(e)}"
 
-    def get_model_info(self) -> Dict[str, Any]:
-        """
-        获取模型信息
+        if answer is None:
+            self._log_bad_response("API响应格式异常", response_body)
+            return "无法从API获取答案"
 
-        Returns:
-            Dict: 模型信息
-        """
-        return {
+        logger.debug("AI返回答案: %.100s...", answer)
+        return answer
+
+    @cached_property
+    def _model_info(self) -> Mapping[str, Any]:
+        """模型信息（首次访问时构建，之后每次返回同一个只读映射）"""
+        return MappingProxyType({
             "provider": "DeepSeek",
             "model": self.model,
             "base_url": self.base_url,
             "max_tokens": self.max_tokens,
             "temperature": self.temperature,
             "top_p": self.top_p,
-            "supported_features": [
+            "supported_features": (
                 "chat_completion",
                 "json_response",
                 "temperature_control",
                 "token_limit",
                 "system_prompt"
-            ]
-        }
\ No newline at end of file
+            )
+        })
+
+    def get_model_info(self) -> Mapping[str, Any]:
+        """
+        获取模型信息
+
+        Returns:
+            Mapping: 模型信息（只读）
+        """
+        return self._model_info
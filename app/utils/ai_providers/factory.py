@@ -3,14 +3,20 @@ AI服务提供商工厂模式
 用于创建和管理不同的AI提供商实例
 """
 
-from typing import Dict, Optional
+import logging
+import threading
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional, Tuple
 from ...config import get_settings
+from ...models.structs import AIProviderInfo
 from .base import AIProviderBase
 from .alibaba import AlibabaProvider
 from .deepseek import DeepSeekProvider
 from .openai import OpenAIProvider
 from .google import GoogleProvider
 
+logger = logging.getLogger(__name__)
+
 
 class AIProviderFactory:
     """AI提供商工厂类"""
@@ -26,6 +32,50 @@ class AIProviderFactory:
     # 缓存实例
     _instances_cache: Dict[str, AIProviderBase] = {}
 
+    # 预热结果：提供商信息（只读）、可用提供商名称、默认提供商实例与按优先级排列的可用实例
+    _info_cache: Mapping[str, AIProviderInfo] = MappingProxyType({})
+    _available_names: Tuple[str, ...] = ()
+    _default: Optional[AIProviderBase] = None
+    _by_priority: Tuple[AIProviderBase, ...] = ()
+    _warmed: bool = False
+
+    # 保护缓存写入
+    _lock = threading.Lock()
+
+    @classmethod
+    def warm(cls):
+        """
+        预热工厂（应用启动时调用）
+
+        一次性创建所有已启用的提供商实例，并预先计算提供商信息和默认提供商，
+        之后的请求直接读取缓存，不再访问配置模型
+        """
+        settings = get_settings()
+        info = {}
+
+        for provider_name in cls._providers_map.keys():
+            provider_config = settings.get_provider_config(provider_name)
+            if provider_config:
+                provider = cls.create_provider(provider_name)
+                info[provider_name] = AIProviderInfo(
+                    name=provider_config.name,
+                    enabled=provider_config.enabled,
+                    has_api_key=bool(provider_config.api_key),
+                    model=provider_config.model,
+                    is_available=provider.is_enabled() if provider else False
+                )
+
+        with cls._lock:
+            cls._info_cache = MappingProxyType(info)
+            cls._available_names = tuple(name for name, row in info.items() if row.is_available)
+            cls._default = cls._instances_cache.get(settings.ai_fast.default_provider)
+            others = tuple(
+                cls._instances_cache[name] for name in cls._available_names
+                if name in cls._instances_cache and cls._instances_cache[name] is not cls._default
+            )
+            cls._by_priority = (cls._default,) + others if cls._default is not None else others
+            cls._warmed = True
+
     @classmethod
     def create_provider(cls, provider_name: str) -> Optional[AIProviderBase]:
         """
@@ -38,40 +88,42 @@ class AIProviderFactory:
             AIProviderBase: 提供商实例，如果创建失败返回None
         """
         # 检查缓存
-        if provider_name in cls._instances_cache:
-            return cls._instances_cache[provider_name]
+        instance = cls._instances_cache.get(provider_name)
+        if instance is not None:
+            return instance
 
         # 获取配置
         settings = get_settings()
         provider_config = settings.get_provider_config(provider_name)
 
         if not provider_config:
-            print(f"[Factory] 未找到提供商配置: {provider_name}")
+            logger.warning("未找到提供商配置: %s", provider_name)
             return None
 
         # 检查提供商是否支持
         if provider_name not in cls._providers_map:
-            print(f"[Factory] 不支持的提供商: {provider_name}")
+            logger.warning("不支持的提供商: %s", provider_name)
             return None
 
         try:
             # 创建实例
             provider_class = cls._providers_map[provider_name]
-            instance = provider_class(provider_config.dict())
+            instance = provider_class(provider_config.model_dump())
 
             # 检查是否启用
             if not instance.is_enabled():
-                print(f"[Factory] 提供商未启用或缺少API密钥: {provider_name}")
+                logger.info("提供商未启用或缺少API密钥: %s", provider_name)
                 return None
 
-            # 缓存实例
-            cls._instances_cache[provider_name] = instance
+            # 缓存实例（并发创建时保留先写入的实例）
+            with cls._lock:
+                instance = cls._instances_cache.setdefault(provider_name, instance)
 
-            print(f"[Factory] 成功创建提供商实例: {provider_name}")
+            logger.info("成功创建提供商实例: %s", provider_name)
             return instance
 
         except Exception as e:
-            print(f"[Factory] 创建提供商实例失败: {provider_name}, 错误: {str(e)}")
+            logger.exception("创建提供商实例失败: %s, 错误: %s", provider_name, e)
             return None
 
     @classmethod
@@ -80,11 +132,23 @@ class AIProviderFactory:
         获取默认提供商实例
 
         Returns:
-            AIProviderBase: 默认提供商实例
+            AIProviderBase: 默认提供商实例（预热时确定）
         """
-        settings = get_settings()
-        default_provider_name = settings.ai.default_provider
-        return cls.create_provider(default_provider_name)
+        if not cls._warmed:
+            cls.warm()
+        return cls._default
+
+    @classmethod
+    def get_providers_by_priority(cls) -> Tuple[AIProviderBase, ...]:
+        """
+        获取按优先级排列的可用提供商实例
+
+        Returns:
+            Tuple[AIProviderBase, ...]: 默认提供商在前，其余可用提供商按注册顺序排列（预热时计算）
+        """
+        if not cls._warmed:
+            cls.warm()
+        return cls._by_priority
 
     @classmethod
     def get_available_providers(cls) -> Dict[str, AIProviderBase]:
@@ -94,7 +158,6 @@ class AIProviderFactory:
         Returns:
             Dict[str, AIProviderBase]: 可用提供商字典
         """
-        settings = get_settings()
         available_providers = {}
 
         for provider_name in cls._providers_map.keys():
@@ -126,36 +189,43 @@ class AIProviderFactory:
         if not issubclass(provider_class, AIProviderBase):
             raise ValueError("提供商类必须继承自AIProviderBase")
 
-        cls._providers_map[name] = provider_class
-        print(f"[Factory] 注册新提供商: {name}")
+        with cls._lock:
+            cls._providers_map[name] = provider_class
+            cls._warmed = False
+        logger.info("注册新提供商: %s", name)
 
     @classmethod
     def clear_cache(cls):
-        """清空实例缓存"""
-        cls._instances_cache.clear()
-        print("[Factory] 已清空提供商实例缓存")
+        """清空实例缓存（下次使用时重新预热）"""
+        with cls._lock:
+            cls._instances_cache.clear()
+            cls._info_cache = MappingProxyType({})
+            cls._available_names = ()
+            cls._default = None
+            cls._by_priority = ()
+            cls._warmed = False
+        logger.debug("已清空提供商实例缓存")
 
     @classmethod
-    def get_provider_info(cls) -> Dict[str, Dict[str, any]]:
+    def get_provider_info(cls) -> Mapping[str, AIProviderInfo]:
         """
         获取所有提供商的信息
 
         Returns:
-            Dict: 提供商信息字典
+            Mapping[str, AIProviderInfo]: 提供商信息（预热时计算的只读映射）
         """
-        settings = get_settings()
-        info = {}
+        if not cls._warmed:
+            cls.warm()
+        return cls._info_cache
 
-        for provider_name in cls._providers_map.keys():
-            provider_config = settings.get_provider_config(provider_name)
-            if provider_config:
-                provider = cls.create_provider(provider_name)
-                info[provider_name] = {
-                    'name': provider_config.name,
-                    'enabled': provider_config.enabled,
-                    'has_api_key': bool(provider_config.api_key),
-                    'model': provider_config.model,
-                    'is_available': provider.is_enabled() if provider else False
-                }
-
-        return info
\ No newline at end of file
+    @classmethod
+    def get_available_names(cls) -> Tuple[str, ...]:
+        """
+        获取可用的提供商名称
+
+        Returns:
+            Tuple[str, ...]: 可用提供商名称（预热时计算）
+        """
+        if not cls._warmed:
+            cls.warm()
+        return cls._available_names
@@ -3,15 +3,83 @@ Google Studio AI服务适配器
 支持Google Gemini平台的AI模型调用
 """
 
-import json
-from typing import Dict, Any
+import logging
+from functools import cached_property
+from types import MappingProxyType
+from typing import Any, Dict, Mapping
+
+from . import _responses
 from .base import AIProviderBase
 
+logger = logging.getLogger(__name__)
+
+
+# 提示词固定前缀（到问题字段为止，后面依次拼接问题、选项和类型）
+_PROMPT_HEAD = '''你是一个专业的题库回答助手。请根据提供的问题和选项给出准确答案。
+
+答题规则：
+1. 选择题：直接返回选项内容，不是字母
+2. 多选题：多个答案用"###"连接
+3. 判断题：直接返回"对"或"错"
+4. 填空题：直接填写内容，多个空用"###"连接
+
+回答格式必须是严格的JSON格式：{"answer":"你的答案"}
+
+请回答以下问题：
+
+问题：'''
+
+
+# 安全设置（所有请求共用）
+_SAFETY_SETTINGS = [
+    {
+        "category": "HARM_CATEGORY_HARASSMENT",
+        "threshold": "BLOCK_NONE"
+    },
+    {
+        "category": "HARM_CATEGORY_HATE_SPEECH",
+        "threshold": "BLOCK_NONE"
+    },
+    {
+        "category": "HARM_CATEGORY_SEXUALLY_EXPLICIT",
+        "threshold": "BLOCK_NONE"
+    },
+    {
+        "category": "HARM_CATEGORY_DANGEROUS_CONTENT",
+        "threshold": "BLOCK_NONE"
+    }
+]
+
 
 class GoogleProvider(AIProviderBase):
     """Google Studio AI服务提供商"""
 
-    def query(self, question: str, options: str = "", question_type: str = "") -> str:
+    def __init__(self, config: Dict[str, Any]):
+        """
+        初始化Google Gemini提供商，预先构建请求数据中不随问题变化的部分
+
+        Args:
+            config: 提供商配置字典
+        """
+        super().__init__(config)
+        self._request_template = {
+            "generationConfig": {
+                "temperature": self.temperature,
+                "topP": self.top_p,
+                "maxOutputTokens": self.max_tokens,
+                "stopSequences": []
+            },
+            "safetySettings": _SAFETY_SETTINGS
+        }
+        # 接口地址固定（流式响应使用SSE格式的 streamGenerateContent）；
+        # API Key 放在请求头中，不出现在URL和请求日志里
+        if self.stream:
+            self._endpoint = f"{self.base_url}/models/{self.model}:streamGenerateContent?alt=sse"
+        else:
+            self._endpoint = f"{self.base_url}/models/{self.model}:generateContent"
+        self._headers = {"x-goog-api-key": self.api_key}
+
+    async def query(self, question: str, options: str = "", question_type: str = "") -> str:
         """
         查询Google Gemini AI模型获取答案
 
@@ -27,30 +95,36 @@ class GoogleProvider(AIProviderBase):
             # 构建提示词
             prompt = self._build_prompt(question, options, question_type)
 
-            # 准备请求数据
-            request_data = self._prepare_request_data(prompt)
-
-            # 准备请求头
-            headers = {
-                "Content-Type": "application/json"
-            }
-
-            # Google API使用API Key作为查询参数
-            url = f"{self.base_url}/models/{self.model}:generateContent?key={self.api_key}"
-
-            # 发送请求
-            response_text = self._make_request(url, headers, request_data)
-
-            # 解析响应
-            answer = self._parse_response(response_text)
+            # 发送请求并解析响应
+            answer = await self._complete(prompt)
 
             # 提取JSON格式的答案
             return self._extract_answer_from_json(answer)
 
         except Exception as e:
-            print(f"[Google] 查询失败: {str(e)}")
+            logger.warning("查询失败: %s", e)
             return f"Google Studio API调用失败: {str(e)}"
 
+    async def _complete(self, prompt: str, batch: bool = False) -> str:
+        """
+        发送提示词到Google Gemini并返回模型的回答内容
+
+        Args:
+            prompt: 提示词
+            batch: 是否为批量提问
+
+        Returns:
+            str: 模型回答的原始内容
+
+        Raises:
+            Exception: 请求失败时抛出异常
+        """
+        # 准备请求数据
+        request_data = self._prepare_request_data(prompt)
+
+        # 发送请求并解析响应（流式请求收到完整答案后即结束；批量回答需读完整个数组）
+        return await self._request_answer(self._endpoint, self._headers, request_data, stop_early=not batch)
+
     def _build_prompt(self, question: str, options: str, question_type: str) -> str:
         """
         构建Google Gemini提示词
@@ -63,19 +137,11 @@ class GoogleProvider(AIProviderBase):
         Returns:
             str: 构建的提示词
         """
-        content = '''你是一个专业的题库回答助手。请根据提供的问题和选项给出准确答案。
-
-答题规则：
-1. 选择题：直接返回选项内容，不是字母
-2. 多选题：多个答案用"###"连接
-3. 判断题：直接返回"对"或"错"
-4. 填空题：直接填写内容，多个空用"###"连接
-
-回答格式必须是严格的JSON格式：{"answer":"你的答案"}
-
-请回答以下问题：'''
-
-        return f"{content}\n\n问题：{question}\n选项：{options}\n类型：{question_type}"
+        return "".join((
+            _PROMPT_HEAD, question,
+            "\n选项：", options,
+            "\n类型：", question_type
+        ))
 
     def _prepare_request_data(self, prompt: str) -> Dict[str, Any]:
         """
@@ -87,91 +153,76 @@ class GoogleProvider(AIProviderBase):
         Returns:
             Dict: 请求数据
         """
-        return {
-            "contents": [
-                {
-                    "parts": [
-                        {
-                            "text": prompt
-                        }
-                    ]
-                }
-            ],
-            "generationConfig": {
-                "temperature": self.temperature,
-                "topP": self.top_p,
-                "maxOutputTokens": self.max_tokens,
-                "stopSequences": []
-            },
-            "safetySettings": [
-                {
-                    "category": "HARM_CATEGORY_HARASSMENT",
-                    "threshold": "BLOCK_NONE"
-                },
-                {
-                    "category": "HARM_CATEGORY_HATE_SPEECH",
-                    "threshold": "BLOCK_NONE"
-                },
-                {
-                    "category": "HARM_CATEGORY_SEXUALLY_EXPLICIT",
-                    "threshold": "BLOCK_NONE"
-                },
-                {
-                    "category": "HARM_CATEGORY_DANGEROUS_CONTENT",
-                    "threshold": "BLOCK_NONE"
-                }
-            ]
-        }
+        # 浅拷贝模板，只新建包含提示词的contents（并发请求之间不共享可变数据）
+        return {"contents": [{"parts": [{"text": prompt}]}], **self._request_template}
 
-    def _parse_response(self, response_text: str) -> str:
+    def _stream_delta(self, event: Dict[str, Any]) -> str:
+        """
+        从Gemini流式事件中取出新增的回答内容
+
+        Args:
+            event: 解码后的事件数据
+
+        Returns:
+            str: 新增内容，没有时返回空字符串
+        """
+        candidates = event.get("candidates")
+        if not candidates:
+            return ""
+        parts = candidates[0].get("content", {}).get("parts")
+        if not parts:
+            return ""
+        return "".join(part.get("text", "") for part in parts)
+
+    def _parse_response(self, response_body: bytes) -> str:
         """
         解析Google Gemini响应内容
 
         Args:
-            response_text: 原始响应文本
+            response_body: 原始响应体
 
         Returns:
             str: 解析后的答案
         """
         try:
-            # 解析JSON响应
-            result = json.loads(response_text)
-
-            if "candidates" in result and len(result["candidates"]) > 0:
-                candidate = result["candidates"][0]
-                if "content" in candidate and "parts" in candidate["content"]:
-                    answer = candidate["content"]["parts"][0]["text"]
-                    print(f"[Google] AI返回答案: {answer[:100]}...")
-                    return answer
+            # 按响应结构直接解码
+            answer = _responses.gemini_text(response_body)
+        except _responses.DecodeError as e:
+            self._log_bad_response(f"JSON解析错误: {e}", response_body)
+            return f"API响应解析失败: {str(e)}"
 
-            print(f"[Google] API响应格式异常: {response_text}")
+        if answer is None:
+            self._log_bad_response("API响应格式异常", response_body)
             return "无法从API获取答案"
 
-        except json.JSONDecodeError as e:
-            print(f"[Google] JSON解析错误: {str(e)}")
-            print(f"[Google] 响应内容: {response_text}")
-            return f"API响应解析失败: {str(e)}"
+        logger.debug("AI返回答案: %.100s...", answer)
+        return answer
 
-    def get_model_info(self) -> Dict[str, Any]:
-        """
-        获取模型信息
-
-        Returns:
-            Dict: 模型信息
-        """
-        return {
+    @cached_property
+    def _model_info(self) -> Mapping[str, Any]:
+        """模型信息（首次访问时构建，之后每次返回同一个只读映射）"""
+        return MappingProxyType({
             "provider": "Google Studio",
             "model": self.model,
             "base_url": self.base_url,
             "max_tokens": self.max_tokens,
             "temperature": self.temperature,
             "top_p": self.top_p,
-            "supported_features": [
+            "supported_features": (
                 "chat_completion",
                 "json_response",
                 "temperature_control",
                 "token_limit",
                 "safety_filters",
                 "multimodal"
-            ]
-        }
\ No newline at end of file
+            )
+        })
+
+    def get_model_info(self) -> Mapping[str, Any]:
+        """
+        获取模型信息
+
+        Returns:
+            Mapping: 模型信息（只读）
+        """
+        return self._model_info
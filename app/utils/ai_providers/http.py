@@ -0,0 +1,90 @@
+"""
+AI提供商共享HTTP客户端
+所有提供商复用同一个异步连接池（支持HTTP/2），避免每次请求重新建立TCP/TLS连接；
+始终校验证书，SSL上下文只创建一次，连接复用时可以恢复TLS会话
+"""
+
+import ssl
+from typing import Dict, Iterable, Optional
+
+import httpx
+
+# 连接池上限；空闲连接保留30秒，间歇性的查询也能复用已建立的TLS连接
+_LIMITS = httpx.Limits(max_keepalive_connections=50, max_connections=100, keepalive_expiry=30)
+
+# 建立连接失败时由传输层立即重试的次数（不影响已发出的请求）
+_CONNECT_RETRIES = 2
+
+# 按CA证书文件区分的SSL上下文与客户端（None 表示系统默认证书）
+_ssl_contexts: Dict[Optional[str], ssl.SSLContext] = {}
+_clients: Dict[Optional[str], httpx.AsyncClient] = {}
+
+
+def _get_ssl_context(ca_bundle: Optional[str]) -> ssl.SSLContext:
+    """
+    获取可复用的SSL上下文
+
+    Args:
+        ca_bundle: 自定义CA证书文件路径，None时使用默认证书
+
+    Returns:
+        ssl.SSLContext: 开启证书校验的SSL上下文
+    """
+    context = _ssl_contexts.get(ca_bundle)
+    if context is None:
+        if ca_bundle:
+            context = ssl.create_default_context(cafile=ca_bundle)
+        else:
+            context = httpx.create_ssl_context()
+        _ssl_contexts[ca_bundle] = context
+    return context
+
+
+def get_client(ca_bundle: Optional[str] = None) -> httpx.AsyncClient:
+    """
+    获取共享的异步HTTP客户端（首次使用或关闭后重新创建）
+
+    Args:
+        ca_bundle: 自定义CA证书文件路径（自签名证书时使用），同一证书文件共用一个客户端
+
+    Returns:
+        httpx.AsyncClient: HTTP客户端，单次请求的超时由各提供商传入
+    """
+    client = _clients.get(ca_bundle)
+    if client is None or client.is_closed:
+        verify = _get_ssl_context(ca_bundle)
+        client = httpx.AsyncClient(
+            transport=httpx.AsyncHTTPTransport(
+                http2=True,
+                limits=_LIMITS,
+                verify=verify,
+                retries=_CONNECT_RETRIES
+            ),
+            # 以下参数用于根据环境变量创建的代理传输
+            http2=True,
+            limits=_LIMITS,
+            verify=verify,
+            trust_env=True
+        )
+        _clients[ca_bundle] = client
+    return client
+
+
+def open_clients(ca_bundles: Iterable[Optional[str]]):
+    """
+    预先创建提供商要用的共享HTTP客户端（应用启动时调用），
+    证书加载和连接池创建不再落在第一个AI请求上
+
+    Args:
+        ca_bundles: 各提供商配置的CA证书文件路径（None表示系统默认证书）
+    """
+    for ca_bundle in set(ca_bundles):
+        get_client(ca_bundle)
+
+
+async def close_client():
+    """关闭所有共享HTTP客户端（应用关闭时调用）"""
+    clients = list(_clients.values())
+    _clients.clear()
+    for client in clients:
+        await client.aclose()
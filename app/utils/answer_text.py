@@ -0,0 +1,178 @@
+"""
+答案文本处理函数
+每次查询都会执行的纯字符串逻辑（答案提取、有效性检查），
+不依赖应用其他模块且类型注解完整，可以单独用 mypyc 编译为C扩展：
+
+    pip install "mypy[mypyc]"
+    mypyc app/utils/answer_text.py
+
+编译产物（.so/.pyd）放在源码旁边时优先被导入，未编译时按普通Python模块运行
+"""
+
+import logging
+import re
+from typing import Any, Final, List, Optional, Pattern
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+# 答案JSON修复与提取用的正则（模块加载时编译一次）
+_BARE_KEY_FIRST_RE: Final[Pattern[str]] = re.compile(r'{(\s*)(\w+)(\s*):')
+_BARE_KEY_NEXT_RE: Final[Pattern[str]] = re.compile(r',(\s*)(\w+)(\s*):')
+_WHITESPACE_RE: Final[Pattern[str]] = re.compile(r'\s+')
+# 答案字段的字符串值（支持转义字符），同时匹配 answer 和常见拼写错误 anwser
+_ANSWER_VALUE_RE: Final[Pattern[str]] = re.compile(r'"(?:answer|anwser)"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+# 完整的答案JSON（流式响应收到这一段后即可结束；值中转义的引号不算结束）
+_ANSWER_COMPLETE_RE: Final[Pattern[str]] = re.compile(r'"(?:answer|anwser)"\s*:\s*"(?:[^"\\]|\\.)*"\s*}')
+
+# AI返回内容中表示调用出错的关键词（一次扫描匹配全部关键词）
+_ERROR_RE: Final[Pattern[str]] = re.compile("|".join(map(re.escape, [
+    "API调用失败",
+    "无法从API获取答案",
+    "API请求异常",
+    "调用失败",
+    "解析失败",
+    "超时",
+    "错误"
+])))
+
+
+def is_valid_answer(answer: str) -> bool:
+    """
+    检查答案是否有效
+
+    Args:
+        answer: AI返回的答案
+
+    Returns:
+        bool: 答案非空且不包含错误信息
+    """
+    if not answer or not answer.strip():
+        return False
+    return _ERROR_RE.search(answer) is None
+
+
+def is_answer_complete(content: str) -> bool:
+    """
+    检查已收到的内容是否已经包含完整的答案JSON
+
+    Args:
+        content: 流式响应目前累积的内容
+
+    Returns:
+        bool: 是否可以提前结束读取
+    """
+    return _ANSWER_COMPLETE_RE.search(content) is not None
+
+
+def extract_answer_from_json(ai_answer: str, name: str = "") -> str:
+    """
+    从AI返回的答案中提取JSON格式的答案
+
+    Args:
+        ai_answer: AI返回的原始答案
+        name: 提供商名称（用于日志）
+
+    Returns:
+        str: 提取的答案内容，无法提取时返回原始答案
+    """
+    # 快速路径：模型按约定格式输出时直接用正则取出答案，不解析整个JSON，也不受前后多余文字影响
+    answer_match = _ANSWER_VALUE_RE.search(ai_answer)
+    if answer_match:
+        value = _unescape(answer_match.group(1))
+        if value is not None:
+            return value
+
+    json_str = ai_answer
+    try:
+        # 尝试修复并解析JSON格式的答案（单引号、键名无引号等）
+        if "{" in ai_answer and "}" in ai_answer:
+            # 提取JSON部分 - 从第一个{到最后一个}
+            start_idx = ai_answer.find("{")
+            end_idx = ai_answer.rfind("}") + 1
+            json_str = ai_answer[start_idx:end_idx]
+
+            # 处理可能的格式问题
+            # 1. 替换单引号为双引号
+            json_str = json_str.replace("'", '"')
+
+            # 2. 处理没有引号的键名 {answer: -> {"answer":
+            json_str = _BARE_KEY_FIRST_RE.sub(r'{\1"\2"\3:', json_str)
+            json_str = _BARE_KEY_NEXT_RE.sub(r',\1"\2"\3:', json_str)
+
+            # 3. 移除所有换行符和多余空格，使JSON更紧凑
+            json_str = _WHITESPACE_RE.sub(' ', json_str).strip()
+
+            logger.debug("[%s] 处理后的JSON字符串: %s", name, json_str)
+
+            # 尝试解析JSON
+            answer_dict: Any = orjson.loads(json_str)
+
+            # 提取answer字段
+            if isinstance(answer_dict, dict):
+                if "answer" in answer_dict:
+                    return str(answer_dict["answer"])
+                elif "anwser" in answer_dict:  # 处理可能的拼写错误
+                    return str(answer_dict["anwser"])
+
+    except orjson.JSONDecodeError as e:
+        logger.warning("[%s] 解析AI回答JSON失败: %s", name, e)
+
+        # 尝试从修复后的字符串中直接提取答案
+        answer_match = _ANSWER_VALUE_RE.search(json_str)
+        if answer_match:
+            value = _unescape(answer_match.group(1))
+            if value is not None:
+                return value
+
+    # 如果JSON解析失败，返回原始答案
+    return ai_answer
+
+
+def parse_batch_answers(content: str, count: int) -> Optional[List[str]]:
+    """
+    解析批量提问返回的JSON答案数组
+
+    Args:
+        content: 模型回答的原始内容
+        count: 题目数量
+
+    Returns:
+        List[str]: 按题目顺序的答案，格式不符或数量不一致时返回None
+    """
+    start_idx = content.find("[")
+    end_idx = content.rfind("]") + 1
+    if start_idx < 0 or end_idx <= start_idx:
+        return None
+    try:
+        answers: Any = orjson.loads(content[start_idx:end_idx])
+    except orjson.JSONDecodeError:
+        return None
+    if not isinstance(answers, list) or len(answers) != count:
+        return None
+    # 模型有时沿用单题格式，把每道题写成 {"answer":"..."}
+    return [
+        str(answer.get("answer", answer.get("anwser", ""))) if isinstance(answer, dict) else str(answer)
+        for answer in answers
+    ]
+
+
+def _unescape(value: str) -> Optional[str]:
+    """
+    还原JSON字符串中的转义字符
+
+    Args:
+        value: 引号内的原始字符串
+
+    Returns:
+        str: 还原后的字符串，转义不合法时返回None
+    """
+    if "\\" not in value:
+        return value
+    try:
+        decoded: Any = orjson.loads('"' + value + '"')
+    except orjson.JSONDecodeError:
+        return None
+    return str(decoded)
@@ -0,0 +1,72 @@
+"""
+日志配置模块
+使用QueueHandler + QueueListener，请求路径上只把日志记录放入队列，
+格式化和写入由后台线程完成
+"""
+
+import logging
+import logging.handlers
+import os
+import queue
+
+from ..config.settings import LoggingConfig
+
+# 应用日志根记录器名称（各模块使用 logging.getLogger(__name__)）
+APP_LOGGER_NAME = "app"
+
+_SIZE_UNITS = {"KB": 1024, "MB": 1024 ** 2, "GB": 1024 ** 3}
+
+
+def parse_size(size: str) -> int:
+    """
+    解析日志文件大小配置
+
+    Args:
+        size: 大小字符串，例如 "10MB"、"512KB" 或字节数
+
+    Returns:
+        int: 字节数
+    """
+    size = size.strip().upper()
+    for unit, factor in _SIZE_UNITS.items():
+        if size.endswith(unit):
+            return int(float(size[:-len(unit)]) * factor)
+    return int(size.rstrip("B"))
+
+
+def setup_logging(config: LoggingConfig) -> logging.handlers.QueueListener:
+    """
+    配置应用日志
+
+    Args:
+        config: 日志配置
+
+    Returns:
+        QueueListener: 已启动的日志监听器，关闭应用时需调用stop()
+    """
+    formatter = logging.Formatter(config.format)
+
+    handlers = [logging.StreamHandler()]
+    if config.file:
+        log_dir = os.path.dirname(config.file)
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+        handlers.append(logging.handlers.RotatingFileHandler(
+            config.file,
+            maxBytes=parse_size(config.max_size),
+            backupCount=config.backup_count,
+            encoding="utf-8"
+        ))
+
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    app_logger = logging.getLogger(APP_LOGGER_NAME)
+    app_logger.handlers = [logging.handlers.QueueHandler(log_queue)]
+    app_logger.setLevel(config.level.upper())
+    app_logger.propagate = False
+
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
@@ -0,0 +1,31 @@
+"""
+pytest 公共夹具
+测试使用内存SQLite数据库：不写磁盘，整个测试会话只建一次表
+"""
+
+import asyncio
+
+import pytest
+
+from app.models.database import answer_cache, db_manager, init_database
+
+# 测试数据库URL（内存数据库共享同一个连接）
+TEST_DATABASE_URL = "sqlite:///:memory:"
+
+
+@pytest.fixture(scope="session")
+def db():
+    """初始化内存数据库，测试会话结束时关闭"""
+    assert asyncio.run(init_database(url=TEST_DATABASE_URL)), "数据库初始化失败"
+    yield db_manager
+    asyncio.run(db_manager.close())
+
+
+@pytest.fixture
+def empty_db(db):
+    """会写入数据的测试使用：换成新的空内存数据库并清空答案缓存，结束后再换回空库"""
+    assert asyncio.run(init_database(url=TEST_DATABASE_URL)), "数据库初始化失败"
+    answer_cache.clear()
+    yield db
+    answer_cache.clear()
+    assert asyncio.run(init_database(url=TEST_DATABASE_URL)), "数据库初始化失败"
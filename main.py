@@ -13,7 +13,7 @@ AI问答系统启动入口
 - 自动API文档生成
 """
 
-from app.main import app
+from app.main import app, EVENT_LOOP, get_worker_count
 
 if __name__ == "__main__":
     import uvicorn
@@ -26,19 +26,25 @@ if __name__ == "__main__":
     host = settings.server.host
     port = settings.server.port
     reload = settings.server.reload
+    workers = get_worker_count()
 
     print("AI智能题库系统 v2.0")
     print("="*50)
     print(f"作者: Toni Wang")
     print(f"邮箱: shell7@petalmail.com")
     print(f"地址: http://{host}:{port}")
+    print(f"工作进程: {workers}")
     print("="*50)
 
-    # 启动服务器
+    # 启动服务器（多进程和热重载需要以导入字符串指定应用）
     uvicorn.run(
-        app,
+        "app.main:app",
         host=host,
         port=port,
         reload=reload,
-        log_level="info"
+        workers=workers,
+        log_level="info",
+        access_log=False,
+        loop=EVENT_LOOP,
+        http="httptools"
     )
\ No newline at end of file
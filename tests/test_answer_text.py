@@ -0,0 +1,95 @@
+"""
+答案解析测试（答案提取、批量回答、流式响应读取；不发出网络请求）
+"""
+
+import asyncio
+
+import orjson
+import pytest
+
+from app.utils.ai_providers.alibaba import AlibabaProvider
+from app.utils.answer_text import extract_answer_from_json, is_answer_complete, parse_batch_answers
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ('{"answer":"北京"}', "北京"),
+    ('{"anwser":"北京"}', "北京"),                        # 常见拼写错误
+    ('答案如下：{"answer": "北京"} 希望有帮助', "北京"),   # 前后有多余文字
+    (r'{"answer":"他说\"你好\""}', '他说"你好"'),          # 转义的双引号
+    (r'{"answer":"\u5317\u4eac"}', "北京"),                 # \uXXXX 转义
+    (r'{"answer":"第一行\n第二行"}', "第一行\n第二行"),
+    ("{'answer': '北京'}", "北京"),                       # 单引号
+    ("{answer: \"北京\"}", "北京"),                       # 键名没有引号
+    ("北京", "北京"),                                     # 不是JSON时返回原文
+])
+def test_extract_answer_from_json(raw, expected):
+    assert extract_answer_from_json(raw) == expected
+
+
+@pytest.mark.parametrize("content, expected", [
+    ('{"anwser":"北', False),
+    ('{"anwser":"北京"', False),
+    ('{"anwser":"北京"}', True),
+    ('{"answer": "北京" }', True),
+    (r'{"anwser":"他说\"}', False),                       # 转义的引号后面的 } 不是结束
+    (r'{"anwser":"他说\"你好\""}', True),
+    (r'{"anwser":"\u5317\u4eac"}', True),
+])
+def test_is_answer_complete(content, expected):
+    assert is_answer_complete(content) is expected
+
+
+@pytest.mark.parametrize("content, count, expected", [
+    ('["北京","东京"]', 2, ["北京", "东京"]),
+    ('答案：\n["北京", "东京"]\n', 2, ["北京", "东京"]),
+    ('[{"answer":"北京"},{"anwser":"东京"}]', 2, ["北京", "东京"]),   # 沿用单题格式的元素
+    ('["北京"]', 2, None),                                # 数量不一致
+    ('["北京","东京","首尔"]', 2, None),
+    ('["北京","东京"', 2, None),                          # 不完整的JSON
+    ('{"answer":"北京"}', 1, None),                       # 不是数组
+])
+def test_parse_batch_answers(content, count, expected):
+    assert parse_batch_answers(content, count) == expected
+
+
+class FakeStreamResponse:
+    """按行返回SSE事件的流式响应，记录已读取的行数"""
+
+    def __init__(self, lines):
+        self.lines = lines
+        self.consumed = 0
+
+    async def aiter_lines(self):
+        for line in self.lines:
+            self.consumed += 1
+            yield line
+
+
+def _event(content: str) -> str:
+    return "data: " + orjson.dumps({"choices": [{"delta": {"content": content}}]}).decode()
+
+
+@pytest.mark.parametrize("lines, answer, consumed", [
+    # 答案JSON分散在多个事件中，收齐后不再读取剩余事件
+    ([_event('{"anw'), _event('ser":"北'), _event('京"}'), _event("多余内容"), "data: [DONE]"],
+     "北京", 3),
+    # 转义的引号后面紧跟 } 时继续读取
+    ([_event(r'{"anwser":"他说\"}'), _event(r' 你好\""}'), "data: [DONE]"],
+     '他说"} 你好"', 2),
+    # 转义符和被转义的引号分在两个事件中
+    ([_event('{"anwser":"他说\\'), _event('"你好\\"'), _event('"}'), _event("多余内容")],
+     '他说"你好"', 3),
+    # 不是答案JSON时读到 [DONE] 为止，忽略空行、注释和空的增量
+    ([": keep-alive", _event("北京"), "", _event(""), "data: [DONE]", _event("多余内容")],
+     "北京", 5),
+])
+def test_read_event_stream(lines, answer, consumed):
+    async def run():
+        provider = AlibabaProvider({"name": "alibaba", "api_key": "test", "base_url": "http://test", "model": "m"})
+        response = FakeStreamResponse(lines)
+        content = await provider._read_event_stream(response)
+
+        assert extract_answer_from_json(content) == answer
+        assert response.consumed == consumed
+
+    asyncio.run(run())
@@ -0,0 +1,117 @@
+"""
+后台答案写入测试
+"""
+
+import asyncio
+
+from app.models.database import QuestionAnswerRepository, answer_cache
+from app.models.schemas import QueryRequest
+from app.services import answer_writer as answer_writer_module
+from app.services import query_service
+from app.services.answer_writer import AnswerWriter
+from app.services.query_service import QueryService
+
+
+async def _stored_answer(db, question: str):
+    """绕过内存缓存读取数据库中的答案"""
+    answer_cache.clear()
+    async with db.get_connection() as session:
+        record = await QuestionAnswerRepository(session).find_by_question(question)
+    return record.answer if record else None
+
+
+def test_submit_rejected_when_not_running():
+    """后台任务未启动时不接收答案，由调用方同步写入"""
+    writer = AnswerWriter(queue_size=10, batch_size=10, flush_interval=0.01)
+    assert not writer.submit("问题", "答案")
+
+
+def test_submit_rejected_when_queue_full(empty_db):
+    """队列已满时返回False"""
+    async def run():
+        writer = AnswerWriter(queue_size=1, batch_size=10, flush_interval=0.01)
+        writer.start()
+        try:
+            # 两次提交之间没有await，后台任务还来不及取走第一条
+            assert writer.submit("问题1", "答案1")
+            assert not writer.submit("问题2", "答案2")
+        finally:
+            await writer.stop()
+
+    asyncio.run(run())
+
+
+def test_stop_drains_pending_answers(empty_db):
+    """停止时把队列中剩余的答案全部写入数据库"""
+    async def run():
+        writer = AnswerWriter(queue_size=100, batch_size=2, flush_interval=10)
+        writer.start()
+        for i in range(5):
+            assert writer.submit(f"问题{i}", f"答案{i}")
+
+        await writer.stop()
+
+        assert not writer.running
+        for i in range(5):
+            assert await _stored_answer(empty_db, f"问题{i}") == f"答案{i}"
+
+    asyncio.run(run())
+
+
+def test_failed_batch_is_written_one_by_one(empty_db, monkeypatch):
+    """批量写入失败时逐条写入，答案仍然落库"""
+    async def fail_create_many(self, rows):
+        return 0
+
+    monkeypatch.setattr(QuestionAnswerRepository, "create_many", fail_create_many)
+
+    async def run():
+        writer = AnswerWriter(queue_size=100, batch_size=10, flush_interval=10)
+        writer.start()
+        for i in range(3):
+            assert writer.submit(f"问题{i}", f"答案{i}")
+
+        await writer.stop()
+
+        for i in range(3):
+            assert await _stored_answer(empty_db, f"问题{i}") == f"答案{i}"
+
+    asyncio.run(run())
+
+
+def test_unwritable_batch_is_dropped_from_cache(empty_db, monkeypatch):
+    """无法连接数据库时移除提交时写入的缓存，之后的查找不会拿到未落库的答案"""
+    def broken_connection():
+        raise RuntimeError("数据库不可用")
+
+    monkeypatch.setattr(answer_writer_module.db_manager, "get_connection", broken_connection)
+
+    async def run():
+        writer = AnswerWriter(queue_size=100, batch_size=10, flush_interval=10)
+        writer.start()
+        assert writer.submit("问题", "答案")
+        assert answer_cache.get("问题").answer == "答案"
+
+        await writer.stop()
+
+        assert answer_cache.get("问题") is None
+
+    asyncio.run(run())
+
+
+def test_save_falls_back_to_direct_create(empty_db, monkeypatch):
+    """后台写入不可用时 _save_to_database 直接写入数据库"""
+    async def run():
+        assert not query_service.answer_writer.running
+        async with empty_db.get_connection() as session:
+            await QueryService(session)._save_to_database(QueryRequest(title="未启动"), "答案1")
+
+        # 队列已满时同样直接写入
+        monkeypatch.setattr(query_service.answer_writer, "submit", lambda *args: False)
+        async with empty_db.get_connection() as session:
+            await QueryService(session)._save_to_database(QueryRequest(title="队列已满"), "答案2")
+
+        assert await _stored_answer(empty_db, "未启动") == "答案1"
+        assert await _stored_answer(empty_db, "队列已满") == "答案2"
+
+    asyncio.run(run())
@@ -0,0 +1,37 @@
+"""
+API接口测试（查询服务用假实现代替）
+"""
+
+from fastapi.testclient import TestClient
+
+from app.api.dependencies import get_query_service
+from app.main import create_app
+from app.models import structs
+
+
+class FakeQueryService:
+    """记录收到的查询请求并返回固定结果"""
+
+    def __init__(self):
+        self.requests = []
+
+    async def query_answer(self, request):
+        self.requests.append(request)
+        return structs.QueryData(code=1, data="北京", msg="测试", source="public")
+
+
+def test_post_query_accepts_null_options_and_type():
+    """POST /api/query 中 options、type 为 null 时按空字符串处理"""
+    service = FakeQueryService()
+    app = create_app()
+    app.dependency_overrides[get_query_service] = lambda: service
+
+    response = TestClient(app).post(
+        "/api/query", json={"title": "中国的首都是哪里？", "options": None, "type": None}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["data"]["data"] == "北京"
+    request = service.requests[0]
+    assert request.options == ""
+    assert request.type == ""
@@ -0,0 +1,168 @@
+"""
+AI请求合并测试（AI提供商用假实现代替，不发出网络请求）
+"""
+
+import asyncio
+
+import httpx
+import orjson
+import pytest
+
+from app.services.batcher import AsyncBatcher
+from app.utils.ai_providers import http
+from app.utils.ai_providers.openai import OpenAIProvider
+
+_QUESTIONS = ("中国的首都是哪里？", "日本的首都是哪里？")
+
+
+def _make_provider(batch_reply: str):
+    """批量提问返回给定内容、单题提问按题目返回答案JSON的OpenAI提供商，记录发送的提示词"""
+    provider = OpenAIProvider({"name": "openai", "api_key": "test", "base_url": "http://test", "model": "m"})
+    prompts = []
+
+    async def complete(prompt: str, batch: bool = False) -> str:
+        prompts.append(prompt)
+        if batch:
+            return batch_reply
+        answer = "北京" if "中国" in prompt else "东京"
+        return orjson.dumps({"answer": answer}).decode()
+
+    provider._complete = complete
+    return provider, prompts
+
+
+class SlowProvider:
+    """合并请求和逐题请求都要等待很久的提供商"""
+
+    def get_name(self) -> str:
+        return "slow"
+
+    async def query_batch(self, items):
+        await asyncio.sleep(10)
+        return ["答案"] * len(items)
+
+    async def query(self, question: str, options: str = "", question_type: str = "") -> str:
+        await asyncio.sleep(10)
+        return "答案"
+
+
+async def _submit_all(batcher: AsyncBatcher, provider) -> list:
+    return await asyncio.wait_for(
+        asyncio.gather(*(batcher.submit(provider, question) for question in _QUESTIONS)), timeout=1
+    )
+
+
+def test_batch_answers_go_to_their_waiters():
+    """凑满一批后只发送一次请求，答案按题目顺序交给各自的等待者"""
+    async def run():
+        provider, prompts = _make_provider('["北京","东京"]')
+        answers = await _submit_all(AsyncBatcher(max_batch=2, window=10), provider)
+
+        assert answers == ["北京", "东京"]
+        assert len(prompts) == 1
+        assert all(question in prompts[0] for question in _QUESTIONS)
+
+    asyncio.run(run())
+
+
+def test_batch_reply_with_wrong_count_raises():
+    """批量回答的数量与题目数不一致时抛出异常"""
+    async def run():
+        provider, _ = _make_provider('["北京"]')
+        with pytest.raises(ValueError):
+            await provider.query_batch([(question, "", "") for question in _QUESTIONS])
+
+    asyncio.run(run())
+
+
+def test_wrong_count_reply_falls_back_to_single_queries():
+    """批量回答数量不一致时改为逐题请求，每道题得到自己的答案"""
+    async def run():
+        provider, prompts = _make_provider('["北京"]')
+        answers = await _submit_all(AsyncBatcher(max_batch=2, window=10), provider)
+
+        assert answers == ["北京", "东京"]
+        assert len(prompts) == 3
+
+    asyncio.run(run())
+
+
+def _event(content: str) -> bytes:
+    return b"data: " + orjson.dumps({"choices": [{"delta": {"content": content}}]}) + b"\n\n"
+
+
+def test_streamed_batch_reply_is_read_to_the_end(monkeypatch):
+    """流式批量回答不会在第一个完整的答案对象处停止读取，并使用要求返回数组的系统消息"""
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(orjson.loads(request.content))
+        body = _event('[{"answer":"北京"}') + _event(',{"answer":"东京"}]') + b"data: [DONE]\n\n"
+        return httpx.Response(200, content=body, headers={"Content-Type": "text/event-stream"})
+
+    monkeypatch.setattr(http, "_clients", {None: httpx.AsyncClient(transport=httpx.MockTransport(handler))})
+    provider = OpenAIProvider(
+        {"name": "openai", "api_key": "test", "base_url": "http://test", "model": "m", "stream": True}
+    )
+
+    async def run():
+        answers = await provider.query_batch([(question, "", "") for question in _QUESTIONS])
+
+        assert answers == ["北京", "东京"]
+        (request,) = requests
+        assert request["stream"] is True
+        assert "数组" in request["messages"][0]["content"]
+
+    asyncio.run(run())
+
+
+def test_window_flushes_a_single_question():
+    """等待时间到后发送未凑满的一批，只有一道题时直接逐题请求"""
+    async def run():
+        provider, prompts = _make_provider('["北京"]')
+        answer = await asyncio.wait_for(
+            AsyncBatcher(max_batch=8, window=0.01).submit(provider, _QUESTIONS[0]), timeout=1
+        )
+
+        assert answer == "北京"
+        assert len(prompts) == 1
+        assert "多道编号的题目" not in prompts[0]
+
+    asyncio.run(run())
+
+
+def test_cancelled_send_fails_waiters():
+    """发送中的批次被取消时，等待者立即收到异常而不是一直挂起"""
+    async def run():
+        batcher = AsyncBatcher(max_batch=2, window=10)
+        provider = SlowProvider()
+        waiters = [asyncio.create_task(batcher.submit(provider, f"问题{i}")) for i in range(2)]
+        await asyncio.sleep(0.01)
+
+        (send_task,) = batcher._tasks
+        send_task.cancel()
+
+        results = await asyncio.wait_for(asyncio.gather(*waiters, return_exceptions=True), timeout=1)
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+    asyncio.run(run())
+
+
+def test_close_fails_collecting_and_sending_batches():
+    """关闭时收集中和发送中的批次都会结束等待"""
+    async def run():
+        batcher = AsyncBatcher(max_batch=2, window=10)
+        provider = SlowProvider()
+        sending = [asyncio.create_task(batcher.submit(provider, f"问题{i}")) for i in range(2)]
+        collecting = asyncio.create_task(batcher.submit(provider, "问题3"))
+        await asyncio.sleep(0.01)
+        assert batcher._batches and batcher._tasks
+
+        await asyncio.wait_for(batcher.close(), timeout=1)
+
+        for waiter in sending + [collecting]:
+            with pytest.raises(RuntimeError):
+                await waiter
+        assert not batcher._batches
+
+    asyncio.run(run())
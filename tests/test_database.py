@@ -0,0 +1,246 @@
+"""
+数据库与仓储测试
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy import text
+
+from app.models import database
+from app.models.database import DatabaseManager, QuestionAnswerRepository, answer_cache
+
+
+async def _delete_all(db: DatabaseManager):
+    """绕过仓储直接删除所有记录（用于确认答案来自缓存）"""
+    async with db.engine.begin() as conn:
+        await conn.execute(text("DELETE FROM question_answer"))
+
+
+def test_find_by_question_served_from_cache(empty_db):
+    """查到过的问题由内存缓存返回，不再查询数据库"""
+    async def run():
+        async with empty_db.get_connection() as session:
+            repo = QuestionAnswerRepository(session)
+            await repo.create("中国的首都是哪里？", "北京", "A. 北京 B. 上海", "single")
+            assert (await repo.find_by_question("中国的首都是哪里？")).answer == "北京"
+
+        await _delete_all(empty_db)
+        async with empty_db.get_connection() as session:
+            repo = QuestionAnswerRepository(session)
+            record = await repo.find_by_question("中国的首都是哪里？")
+            assert (record.answer, record.options, record.type) == ("北京", "A. 北京 B. 上海", "single")
+
+            answer_cache.clear()
+            assert await repo.find_by_question("中国的首都是哪里？") is None
+
+    asyncio.run(run())
+
+
+def test_create_replaces_cached_answer(empty_db):
+    """更新已缓存问题的答案后，查询返回新答案"""
+    async def run():
+        async with empty_db.get_connection() as session:
+            repo = QuestionAnswerRepository(session)
+            await repo.create("中国的首都是哪里？", "南京")
+            assert (await repo.find_by_question("中国的首都是哪里？")).answer == "南京"
+
+            await repo.create("中国的首都是哪里？", "北京")
+            assert (await repo.find_by_question("中国的首都是哪里？")).answer == "北京"
+
+    asyncio.run(run())
+
+
+def test_disabled_cache_always_reads_database(empty_db, monkeypatch):
+    """关闭缓存时每次都查询数据库"""
+    monkeypatch.setattr(answer_cache, "enabled", False)
+
+    async def run():
+        async with empty_db.get_connection() as session:
+            repo = QuestionAnswerRepository(session)
+            await repo.create("中国的首都是哪里？", "北京")
+            assert (await repo.find_by_question("中国的首都是哪里？")).answer == "北京"
+
+        await _delete_all(empty_db)
+        async with empty_db.get_connection() as session:
+            assert await QuestionAnswerRepository(session).find_by_question("中国的首都是哪里？") is None
+
+    asyncio.run(run())
+
+
+def test_cache_matches_database_lookup(empty_db):
+    """内存缓存与数据库一样精确匹配问题内容，命中与否不影响查找结果"""
+    async def run():
+        async with empty_db.get_connection() as session:
+            repo = QuestionAnswerRepository(session)
+            await repo.create("Hello World", "ans1")
+
+            assert (await repo.find_by_question("Hello World")).answer == "ans1"
+            assert await repo.find_by_question("hello   world") is None
+
+            answer_cache.clear()
+            assert await repo.find_by_question("hello   world") is None
+            record = await repo.find_by_question("Hello World")
+            assert record.answer == "ans1"
+            assert record.question == "Hello World"
+
+    asyncio.run(run())
+
+
+def test_create_then_update_keeps_id(empty_db):
+    """再次写入同一问题时更新答案，记录ID不变"""
+    async def run():
+        async with empty_db.get_connection() as session:
+            repo = QuestionAnswerRepository(session)
+            created = await repo.create("中国的首都是哪里？", "北京", "A. 北京 B. 上海", "single")
+            updated = await repo.create("中国的首都是哪里？", "北京市", "A. 北京市 B. 上海", "single")
+
+            assert updated.id == created.id
+            assert updated.answer == "北京市"
+            assert updated.options == "A. 北京市 B. 上海"
+            assert await repo.count_all() == 1
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("upsert", [True, False])
+def test_create_without_returning_or_upsert(empty_db, monkeypatch, upsert):
+    """旧版SQLite（不支持RETURNING或UPSERT）时写入仍然成功"""
+    monkeypatch.setattr(database, "_RETURNING_DIALECTS", {"postgresql"})
+    if not upsert:
+        monkeypatch.setattr(database, "_UPSERT_INSERTS", {})
+
+    async def run():
+        async with empty_db.get_connection() as session:
+            repo = QuestionAnswerRepository(session)
+            created = await repo.create("问题", "答案1")
+            assert created.answer == "答案1"
+            created_id = created.id
+
+            updated = await repo.create("问题", "答案2")
+            assert updated.id == created_id
+            assert updated.answer == "答案2"
+            answer_cache.clear()
+            assert (await repo.find_by_question("问题")).answer == "答案2"
+
+    asyncio.run(run())
+
+
+def test_create_many_deduplicates_within_batch(empty_db):
+    """同一批中重复的问题只写入一条，以最后一条为准"""
+    async def run():
+        async with empty_db.get_connection() as session:
+            repo = QuestionAnswerRepository(session)
+            written = await repo.create_many([
+                ("问题1", "旧答案", "", ""),
+                ("问题2", "答案2", "", ""),
+                ("问题1", "新答案", "A. 新", "single"),
+            ])
+
+            assert written == 2
+            assert await repo.count_all() == 2
+            record = await repo.find_by_question("问题1")
+            assert (record.answer, record.options, record.type) == ("新答案", "A. 新", "single")
+
+    asyncio.run(run())
+
+
+def test_hash_collision_keeps_questions_apart(empty_db, monkeypatch):
+    """哈希相同的不同问题分别保存，查找时按完整问题内容区分"""
+    monkeypatch.setattr(database, "question_hash", lambda question: 1)
+
+    async def run():
+        async with empty_db.get_connection() as session:
+            repo = QuestionAnswerRepository(session)
+            await repo.create("中国的首都是哪里？", "北京")
+            await repo.create("日本的首都是哪里？", "东京")
+            assert await repo.count_all() == 2
+
+            answer_cache.clear()
+            assert (await repo.find_by_question("中国的首都是哪里？")).answer == "北京"
+            assert (await repo.find_by_question("日本的首都是哪里？")).answer == "东京"
+            assert await repo.find_by_question("韩国的首都是哪里？") is None
+
+    asyncio.run(run())
+
+
+# 旧版本创建的表结构：question 没有唯一索引，也没有 question_hash 列
+_BASELINE_DDL = (
+    "CREATE TABLE question_answer ("
+    "id INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT, "
+    "question VARCHAR(1000) NOT NULL, "
+    "answer TEXT NOT NULL, "
+    "options TEXT, "
+    "type VARCHAR(50), "
+    "created_at DATETIME)"
+)
+
+
+async def _create_baseline_table(db: DatabaseManager):
+    """换成旧版本的表结构，并写入重复的问题"""
+    async with db.engine.begin() as conn:
+        await conn.execute(text("DROP TABLE IF EXISTS question_answer_fts"))
+        await conn.execute(text("DROP TABLE question_answer"))
+        await conn.execute(text(_BASELINE_DDL))
+        await conn.execute(
+            text("INSERT INTO question_answer (question, answer, options, type) VALUES (:q, :a, '', '')"),
+            [
+                {"q": "中国的首都是哪里？", "a": "旧答案"},
+                {"q": "日本的首都是哪里？", "a": "东京"},
+                {"q": "中国的首都是哪里？", "a": "北京"},
+            ]
+        )
+
+
+def test_migration_collapses_duplicates(empty_db):
+    """升级旧表结构：按问题去重保留最新记录，补建唯一索引、哈希列和全文索引"""
+    async def run():
+        await _create_baseline_table(empty_db)
+        await empty_db.create_tables()
+
+        async with empty_db.get_connection() as session:
+            repo = QuestionAnswerRepository(session)
+            assert await repo.count_all() == 2
+            # 按回填的哈希查找
+            assert (await repo.find_by_question("中国的首都是哪里？")).answer == "北京"
+            # 全文索引已为迁移前的记录建立
+            assert empty_db.fulltext_enabled
+            assert {r.answer for r in await repo.search_by_keyword("首都是哪里")} == {"北京", "东京"}
+
+            # 唯一索引生效：再次写入同一问题只会更新
+            await repo.create("日本的首都是哪里？", "東京")
+            assert await repo.count_all() == 2
+
+    asyncio.run(run())
+
+
+_SEARCH_ROWS = [
+    ("中国的首都是哪里？", "北京"),
+    ("水的化学式是什么？", "H2O"),
+    ('成语"画蛇添足"的意思是？', "多此一举"),
+]
+
+
+@pytest.mark.parametrize("fulltext", [True, False])
+@pytest.mark.parametrize("keyword, expected", [
+    ("首都", ["北京"]),                    # 2个字符：LIKE查询
+    ("水", ["H2O"]),                       # 1个字符：LIKE查询
+    ("化学式", ["H2O"]),                   # 全文索引
+    ('"画蛇添足"', ["多此一举"]),           # 包含双引号
+    ('画蛇"', []),
+    ("不存在的内容", []),
+])
+def test_search_by_keyword(empty_db, monkeypatch, fulltext, keyword, expected):
+    """关键词搜索：全文索引与LIKE回退的结果一致"""
+    assert empty_db.fulltext_enabled
+    if not fulltext:
+        monkeypatch.setattr(empty_db, "fulltext_enabled", False)
+
+    async def run():
+        async with empty_db.get_connection() as session:
+            repo = QuestionAnswerRepository(session)
+            for question, answer in _SEARCH_ROWS:
+                await repo.create(question, answer)
+            assert [r.answer for r in await repo.search_by_keyword(keyword)] == expected
+
+    asyncio.run(run())
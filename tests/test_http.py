@@ -0,0 +1,25 @@
+"""
+共享HTTP客户端测试
+"""
+
+import asyncio
+
+from app.utils.ai_providers import http
+
+
+def test_open_clients_are_the_clients_providers_use(monkeypatch):
+    """启动时创建的客户端就是提供商取得的实例，关闭后不再复用"""
+    monkeypatch.setattr(http, "_clients", {})
+
+    async def run():
+        http.open_clients([None, None])
+        assert list(http._clients) == [None]
+
+        client = http._clients[None]
+        assert http.get_client() is client
+
+        await http.close_client()
+        assert client.is_closed
+        assert not http._clients
+
+    asyncio.run(run())
@@ -0,0 +1,239 @@
+"""
+查询服务测试（AI提供商和题库仓储用假实现代替，不发出网络请求）
+"""
+
+import asyncio
+import dataclasses
+
+import pytest
+
+from app.models.database import QuestionAnswer
+from app.models.schemas import QueryRequest
+from app.services import query_service
+from app.services.query_service import QueryService
+
+
+class FakeProvider:
+    """按给定延迟返回固定答案的提供商，记录调用与取消情况"""
+
+    model = "fake-model"
+
+    def __init__(self, name: str, answer, delay: float = 0.0):
+        self.name = name
+        self.answer = answer
+        self.delay = delay
+        self.calls = 0
+        self.cancelled = False
+
+    def get_name(self) -> str:
+        return self.name
+
+    async def query(self, question: str, options: str = "", question_type: str = "") -> str:
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if isinstance(self.answer, BaseException):
+            raise self.answer
+        return self.answer
+
+
+class FakeRepository:
+    """按给定延迟查找的题库仓储，记录写入的答案"""
+
+    def __init__(self, records: dict, delay: float = 0.0):
+        self.records = records
+        self.delay = delay
+        self.saved = []
+
+    async def find_by_question(self, question: str):
+        await asyncio.sleep(self.delay)
+        answer = self.records.get(question)
+        return QuestionAnswer(question=question, answer=answer) if answer is not None else None
+
+    async def create(self, question: str, answer: str, options: str = "", question_type: str = ""):
+        self.saved.append((question, answer))
+
+
+@pytest.fixture
+def speculative(monkeypatch):
+    """开启推测执行"""
+    settings = QueryService.settings
+    monkeypatch.setattr(settings, "ai_fast", dataclasses.replace(settings.ai_fast, speculative=True))
+
+
+def _make_service(monkeypatch, provider: FakeProvider, repository: FakeRepository) -> QueryService:
+    monkeypatch.setattr(QueryService.ai_factory, "get_default_provider", lambda: provider)
+    service = QueryService(None)
+    service.repository = repository
+    return service
+
+
+def test_speculative_hit_cancels_ai_request(monkeypatch, speculative):
+    """推测执行时本地命中，提前发起的AI请求被取消"""
+    provider = FakeProvider("fake", "南京", delay=10)
+    service = _make_service(monkeypatch, provider, FakeRepository({"首都是哪里": "北京"}, delay=0.01))
+
+    async def run():
+        result = await asyncio.wait_for(service.query_answer(QueryRequest(title="首都是哪里")), timeout=1)
+        await asyncio.sleep(0)
+
+        assert (result.data, result.source) == ("北京", "public")
+        assert provider.calls == 1
+        assert provider.cancelled
+
+    asyncio.run(run())
+
+
+def test_speculative_miss_uses_started_request(monkeypatch, speculative):
+    """推测执行时本地未命中，直接使用已发起的AI请求并保存答案"""
+    provider = FakeProvider("fake", "北京", delay=0.01)
+    repository = FakeRepository({}, delay=0.01)
+    service = _make_service(monkeypatch, provider, repository)
+
+    async def run():
+        result = await asyncio.wait_for(service.query_answer(QueryRequest(title="首都是哪里")), timeout=1)
+
+        assert (result.data, result.source) == ("北京", "ai")
+        assert provider.calls == 1
+        assert repository.saved == [("首都是哪里", "北京")]
+
+    asyncio.run(run())
+
+
+def test_local_hit_skips_ai_without_speculation(monkeypatch):
+    """未开启推测执行时本地命中不会调用AI"""
+    provider = FakeProvider("fake", "南京")
+    service = _make_service(monkeypatch, provider, FakeRepository({"首都是哪里": "北京"}))
+
+    async def run():
+        result = await service.query_answer(QueryRequest(title="首都是哪里"))
+
+        assert result.data == "北京"
+        assert provider.calls == 0
+
+    asyncio.run(run())
+
+
+def test_shared_query_restarts_after_last_waiter_cancels(monkeypatch):
+    """最后一个等待者取消后立即到达的相同问题重新发起请求，而不是拿到已取消的任务"""
+    provider = FakeProvider("fake", "北京", delay=0.05)
+    monkeypatch.setattr(QueryService.ai_factory, "get_default_provider", lambda: provider)
+
+    async def run():
+        service = QueryService(None)
+        request = QueryRequest(title="首都是哪里")
+
+        first = asyncio.create_task(service._query_ai_shared(request))
+        await asyncio.sleep(0.01)
+        # 新请求紧跟在取消之后执行（在已取消任务的完成回调之前）
+        first.cancel()
+        second = asyncio.create_task(service._query_ai_shared(request))
+
+        assert await second == "北京"
+        assert first.cancelled()
+        assert provider.calls == 2
+        assert not query_service._INFLIGHT
+
+    asyncio.run(run())
+
+
+def test_shared_query_matches_exact_question(monkeypatch):
+    """只有完全相同的问题共享AI请求，大小写或空白不同的问题各自请求"""
+    provider = FakeProvider("fake", "北京", delay=0.01)
+    monkeypatch.setattr(QueryService.ai_factory, "get_default_provider", lambda: provider)
+
+    async def run():
+        service = QueryService(None)
+        titles = ("Capital of China?", "Capital of China?", "capital of  china?")
+        answers = await asyncio.wait_for(
+            asyncio.gather(*(service._query_ai_shared(QueryRequest(title=title)) for title in titles)), timeout=1
+        )
+
+        assert answers == ["北京"] * 3
+        assert provider.calls == 2
+
+    asyncio.run(run())
+
+
+def test_race_skips_invalid_answer_and_cancels_the_rest():
+    """最先返回的答案无效时等待较慢的有效答案，得到答案后取消其余请求"""
+    invalid = FakeProvider("invalid", "OpenAI API调用失败: 超时", delay=0)
+    valid = FakeProvider("valid", "北京", delay=0.02)
+    slow = FakeProvider("slow", "南京", delay=10)
+
+    async def run():
+        service = QueryService(None)
+        answer = await asyncio.wait_for(
+            service._race_providers((invalid, valid, slow), QueryRequest(title="首都是哪里")), timeout=1
+        )
+        # 让被取消的任务处理取消
+        await asyncio.sleep(0)
+
+        assert answer == "北京"
+        assert [p.calls for p in (invalid, valid, slow)] == [1, 1, 1]
+        assert slow.cancelled
+        assert not valid.cancelled
+
+    asyncio.run(run())
+
+
+def test_race_returns_none_when_all_providers_fail():
+    """所有提供商都出错或返回无效答案时返回None"""
+    providers = (
+        FakeProvider("error", RuntimeError("连接失败"), delay=0.01),
+        FakeProvider("invalid", "无法从API获取答案", delay=0),
+        FakeProvider("empty", "  ", delay=0.02),
+    )
+
+    async def run():
+        service = QueryService(None)
+        answer = await asyncio.wait_for(
+            service._race_providers(providers, QueryRequest(title="首都是哪里")), timeout=1
+        )
+
+        assert answer is None
+        assert all(p.calls == 1 and not p.cancelled for p in providers)
+
+    asyncio.run(run())
+
+
+def test_cancelled_race_cancels_every_provider():
+    """调用方取消时，所有仍在进行的提供商请求都被取消"""
+    providers = (FakeProvider("a", "北京", delay=10), FakeProvider("b", "北京", delay=10))
+
+    async def run():
+        service = QueryService(None)
+        race = asyncio.create_task(service._race_providers(providers, QueryRequest(title="首都是哪里")))
+        await asyncio.sleep(0.01)
+
+        race.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await race
+        await asyncio.sleep(0)
+
+        assert all(p.calls == 1 and p.cancelled for p in providers)
+
+    asyncio.run(run())
+
+
+def test_parallel_fallback_answers_from_fastest_valid_provider(monkeypatch):
+    """开启并行回退时查询由最快返回有效答案的提供商回答"""
+    dead = FakeProvider("dead", RuntimeError("连接失败"), delay=0)
+    healthy = FakeProvider("healthy", "北京", delay=0.01)
+    settings = QueryService.settings
+    monkeypatch.setattr(settings, "ai_fast", dataclasses.replace(settings.ai_fast, parallel_fallback=True))
+    monkeypatch.setattr(QueryService.ai_factory, "get_providers_by_priority", lambda: (dead, healthy))
+    repository = FakeRepository({})
+    service = QueryService(None)
+    service.repository = repository
+
+    async def run():
+        result = await asyncio.wait_for(service.query_answer(QueryRequest(title="首都是哪里")), timeout=1)
+
+        assert (result.data, result.source) == ("北京", "ai")
+        assert repository.saved == [("首都是哪里", "北京")]
+
+    asyncio.run(run())
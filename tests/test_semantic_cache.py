@@ -0,0 +1,115 @@
+"""
+语义缓存测试（需要 hnswlib；句向量模型用按字符计数的假模型代替）
+"""
+
+import asyncio
+import os
+
+import pytest
+
+from app.config.settings import SemanticCacheConfig
+from app.services import semantic_cache as semantic_cache_module
+from app.services.semantic_cache import SemanticCache
+
+np = pytest.importorskip("numpy")
+hnswlib = pytest.importorskip("hnswlib")
+
+_DIM = 64
+
+
+class FakeSentenceTransformer:
+    """忽略标点，按字符计数构造句向量（只差标点的句子向量相同）"""
+
+    def __init__(self, name: str):
+        pass
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return _DIM
+
+    def encode(self, texts, normalize_embeddings=True):
+        vectors = np.zeros((len(texts), _DIM), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for char in text:
+                if char.isalnum():
+                    vectors[row, ord(char) % _DIM] += 1
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+@pytest.fixture
+def make_cache(monkeypatch, tmp_path):
+    """创建使用临时目录持久化的语义缓存"""
+    monkeypatch.setattr(semantic_cache_module, "hnswlib", hnswlib)
+    monkeypatch.setattr(semantic_cache_module, "SentenceTransformer", FakeSentenceTransformer)
+
+    def make() -> SemanticCache:
+        cache = SemanticCache(SemanticCacheConfig(enabled=True, index_path=str(tmp_path)))
+        cache.load()
+        assert cache.enabled
+        return cache
+
+    return make
+
+
+async def _remember(cache: SemanticCache, question: str, options: str, answer: str):
+    cached, vector = await cache.lookup("p", "m", question, options, "single")
+    assert cached is None
+    cache.add("p", "m", question, options, "single", answer, vector)
+
+
+def test_similar_question_hits(make_cache):
+    """只差标点的问题命中，提供商、模型或题型不同时不命中"""
+    async def run():
+        cache = make_cache()
+        await _remember(cache, "中国的首都是哪里？", "", "北京")
+
+        assert (await cache.lookup("p", "m", "中国的首都是哪里？", "", "single"))[0] == "北京"
+        assert (await cache.lookup("p", "m", "中国的首都是哪里!", "", "single"))[0] == "北京"
+        assert (await cache.lookup("q", "m", "中国的首都是哪里？", "", "single"))[0] is None
+        assert (await cache.lookup("p", "n", "中国的首都是哪里？", "", "single"))[0] is None
+        assert (await cache.lookup("p", "m", "中国的首都是哪里？", "", "judgement"))[0] is None
+        assert (await cache.lookup("p", "m", "日本的首都是哪里？", "", "single"))[0] is None
+
+    asyncio.run(run())
+
+
+def test_options_are_part_of_the_key(make_cache):
+    """题干相同但选项不同的题目不共用答案"""
+    async def run():
+        cache = make_cache()
+        await _remember(cache, "下列哪个是水果？", "A. 苹果 B. 白菜", "苹果")
+
+        assert (await cache.lookup("p", "m", "下列哪个是水果？", "A. 苹果 B. 白菜", "single"))[0] == "苹果"
+        assert (await cache.lookup("p", "m", "下列哪个是水果", "A. 苹果 B. 白菜", "single"))[0] == "苹果"
+        assert (await cache.lookup("p", "m", "下列哪个是水果？", "A. 香蕉 B. 土豆", "single"))[0] is None
+
+    asyncio.run(run())
+
+
+def test_save_and_reload(make_cache, tmp_path):
+    """保存后重新加载仍能命中，且不留下临时文件"""
+    async def run():
+        cache = make_cache()
+        await _remember(cache, "中国的首都是哪里？", "", "北京")
+        cache.save()
+        assert sorted(os.listdir(tmp_path)) == ["index.bin", "meta.json"]
+
+        reloaded = make_cache()
+        assert (await reloaded.lookup("p", "m", "中国的首都是哪里!", "", "single"))[0] == "北京"
+
+    asyncio.run(run())
+
+
+def test_mismatched_files_are_discarded(make_cache, tmp_path):
+    """索引与元数据条目数不一致时丢弃旧缓存，不会返回别的问题的答案"""
+    async def run():
+        cache = make_cache()
+        await _remember(cache, "中国的首都是哪里？", "", "北京")
+        await _remember(cache, "日本的首都是哪里？", "", "东京")
+        cache.save()
+        (tmp_path / "meta.json").write_bytes(b'[["k", "p|m|", "single", "x"]]')
+
+        reloaded = make_cache()
+        assert reloaded._entries == []
+        assert (await reloaded.lookup("p", "m", "日本的首都是哪里？", "", "single"))[0] is None
+
+    asyncio.run(run())